@@ -0,0 +1,57 @@
+import multiprocessing
+import signal
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from jobs.queue import run_pending
+
+
+def work(batch_size, poll_interval, burst):
+    stopping = []
+    signal.signal(signal.SIGTERM, lambda *args: stopping.append(True))
+    while not stopping:
+        if run_pending(batch_size):
+            continue
+        if burst:
+            break
+        time.sleep(poll_interval)
+    connections.close_all()
+
+
+class Command(BaseCommand):
+    help = 'Запускает воркеры, которые выполняют фоновые задачи из очереди.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=1)
+        parser.add_argument('--batch-size', type=int, default=20)
+        parser.add_argument('--poll-interval', type=float, default=1.0)
+        parser.add_argument(
+            '--burst',
+            action='store_true',
+            help='Выйти, когда очередь опустеет.',
+        )
+
+    def handle(self, *args, **options):
+        worker_args = (
+            options['batch_size'], options['poll_interval'], options['burst']
+        )
+        if options['workers'] == 1:
+            work(*worker_args)
+            return
+        # Соединения с базой нельзя делить между процессами.
+        connections.close_all()
+        processes = [
+            multiprocessing.Process(target=work, args=worker_args)
+            for _ in range(options['workers'])
+        ]
+        for process in processes:
+            process.start()
+        try:
+            for process in processes:
+                process.join()
+        except KeyboardInterrupt:
+            for process in processes:
+                process.terminate()
+                process.join()
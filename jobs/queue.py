@@ -0,0 +1,106 @@
+import json
+import logging
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+registry = {}
+
+
+def job(func):
+    """Регистрирует функцию как фоновую задачу. Аргументы задачи должны
+    сериализоваться в JSON, поэтому передавайте id, а не объекты."""
+    name = f'{func.__module__}.{func.__name__}'
+    registry[name] = func
+    func.job_name = name
+    return func
+
+
+def enqueue(func, *args, dedup_key=None, delay=0, max_attempts=5, **kwargs):
+    """Ставит задачу в очередь. Пока в очереди есть задача с тем же
+    dedup_key, повторная постановка ничего не делает.
+
+    При JOBS_EAGER задача выполняется сразу, без записи в базу."""
+    if settings.JOBS_EAGER:
+        func(*args, **kwargs)
+        return None
+    try:
+        with transaction.atomic():
+            return Job.objects.create(
+                name=func.job_name,
+                payload=json.dumps({'args': args, 'kwargs': kwargs}),
+                dedup_key=dedup_key,
+                max_attempts=max_attempts,
+                run_at=timezone.now() + timedelta(seconds=delay),
+            )
+    except IntegrityError:
+        return None
+
+
+def claim(limit):
+    """Захватывает до limit готовых к запуску задач. Захват — условный
+    UPDATE, поэтому одну задачу не возьмут два воркера. Захваченная задача
+    освобождает dedup_key: изменения, случившиеся после ее старта, должны
+    поставить новую задачу, а не раствориться в уже выполняемой."""
+    now = timezone.now()
+    candidates = Job.objects.filter(
+        Q(locked_until__isnull=True) | Q(locked_until__lt=now),
+        status=Job.QUEUED,
+        run_at__lte=now,
+    ).values_list('pk', 'locked_until')[:limit]
+    lease = now + timedelta(seconds=settings.JOBS_LEASE)
+    claimed = []
+    for pk, locked_until in candidates:
+        updated = Job.objects.filter(
+            pk=pk, locked_until=locked_until
+        ).update(
+            locked_until=lease,
+            attempts=F('attempts') + 1,
+            dedup_key=None,
+        )
+        if updated:
+            claimed.append(pk)
+    return list(Job.objects.filter(pk__in=claimed))
+
+
+def run(job_row):
+    func = registry.get(job_row.name)
+    try:
+        if func is None:
+            raise LookupError(f'Unknown job {job_row.name}')
+        payload = json.loads(job_row.payload)
+        func(*payload['args'], **payload['kwargs'])
+    except Exception:
+        fail(job_row, traceback.format_exc())
+        return False
+    job_row.delete()
+    return True
+
+
+def fail(job_row, error):
+    logger.warning('Job %s failed: %s', job_row.name, error)
+    job_row.last_error = error
+    job_row.locked_until = None
+    if job_row.attempts >= job_row.max_attempts:
+        job_row.status = Job.FAILED
+    else:
+        job_row.run_at = timezone.now() + timedelta(
+            seconds=settings.JOBS_RETRY_DELAY * 2 ** (job_row.attempts - 1)
+        )
+    job_row.save()
+
+
+def run_pending(limit=100):
+    done = 0
+    for job_row in claim(limit):
+        run(job_row)
+        done += 1
+    return done
@@ -0,0 +1,54 @@
+from django.test import TestCase, override_settings
+
+from .models import Job
+from .queue import enqueue, job, run_pending
+
+calls = []
+
+
+@job
+def remember(value):
+    calls.append(value)
+
+
+@job
+def explode():
+    raise RuntimeError('boom')
+
+
+@override_settings(JOBS_EAGER=False, JOBS_RETRY_DELAY=0)
+class QueueTest(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_job_runs_and_is_removed(self):
+        enqueue(remember, 'value')
+        self.assertEqual(calls, [])
+        self.assertEqual(run_pending(), 1)
+        self.assertEqual(calls, ['value'])
+        self.assertFalse(Job.objects.exists())
+
+    def test_dedup_key_collapses_pending_jobs(self):
+        enqueue(remember, 1, dedup_key='same')
+        enqueue(remember, 2, dedup_key='same')
+        run_pending()
+        self.assertEqual(calls, [1])
+        enqueue(remember, 3, dedup_key='same')
+        run_pending()
+        self.assertEqual(calls, [1, 3])
+
+    def test_failing_job_is_retried_then_marked_failed(self):
+        enqueue(explode, max_attempts=2)
+        run_pending()
+        retried = Job.objects.get()
+        self.assertEqual(retried.status, Job.QUEUED)
+        self.assertIn('boom', retried.last_error)
+        run_pending()
+        self.assertEqual(Job.objects.get().status, Job.FAILED)
+        self.assertEqual(run_pending(), 0)
+
+    @override_settings(JOBS_EAGER=True)
+    def test_eager_mode_runs_immediately(self):
+        enqueue(remember, 'now')
+        self.assertEqual(calls, ['now'])
+        self.assertFalse(Job.objects.exists())
@@ -1,13 +1,33 @@
 from django.contrib import admin
 
-from .models import Comment, Follow, Group, Post
+from .models import (
+    Comment, Follow, Group, Notification, Post, PostRevision, Tag
+)
+
+
+class PostRevisionInline(admin.TabularInline):
+    model = PostRevision
+    fields = ('created', 'text', 'image')
+    readonly_fields = fields
+    extra = 0
+    can_delete = False
+
+    def has_add_permission(self, request, obj=None):
+        return False
 
 
 class PostAdmin (admin.ModelAdmin):
-    list_display = ("pk", "text", "pub_date", "author", "group", 'image')
+    list_display = (
+        "pk", "text", "pub_date", "author", "group", 'image', 'deleted_at'
+    )
     search_fields = ("text",) 
-    list_filter = ("pub_date",)
+    list_filter = ("pub_date", "deleted_at")
     empty_value_display = "-пусто-"
+    inlines = (PostRevisionInline,)
+    raw_id_fields = ('tags', 'mentions')
+
+    def get_queryset(self, request):
+        return Post.all_objects.select_related('author', 'group')
 
 
 class GroupAdmin (admin.ModelAdmin):
@@ -18,6 +38,11 @@ class GroupAdmin (admin.ModelAdmin):
     empty_value_display = "-пусто-"
 
 
+class TagAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'name')
+    search_fields = ('name',)
+
+
 class CommentAdmin(admin.ModelAdmin):
     list_display = ('pk', 'author', 'text', 'created', 'post')
     search_fields = ('author', 'post')
@@ -31,7 +56,16 @@ class FollowAdmin(admin.ModelAdmin):
     list_filter = ('user', 'author')
     empty_value_display = '-пусто-'
 
+
+class NotificationAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'recipient', 'actor', 'verb', 'count', 'read')
+    list_filter = ('verb', 'read')
+    raw_id_fields = ('recipient', 'actor', 'post')
+    empty_value_display = '-пусто-'
+
 admin.site.register(Post, PostAdmin)
 admin.site.register(Group, GroupAdmin)
 admin.site.register(Comment, CommentAdmin)
 admin.site.register(Follow, FollowAdmin)
+admin.site.register(Tag, TagAdmin)
+admin.site.register(Notification, NotificationAdmin)
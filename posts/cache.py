@@ -0,0 +1,131 @@
+import math
+import random
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+
+LOCK_TIMEOUT = 10
+LOCK_WAIT = 0.05
+
+
+def _lock_key(key):
+    return f'{key}:lock'
+
+
+def _store(key, compute, timeout, stale_timeout):
+    started = time.time()
+    value = compute()
+    delta = time.time() - started
+    cache.set(key, (value, time.time() + timeout, delta),
+              timeout + stale_timeout)
+    return value
+
+
+def _compute_once(key, compute, timeout, stale_timeout):
+    try:
+        return _store(key, compute, timeout, stale_timeout)
+    finally:
+        cache.delete(_lock_key(key))
+
+
+def get_or_compute(key, compute, timeout, stale_timeout=None, beta=1.0):
+    """Достает значение из кеша или вычисляет его, не допуская
+    одновременного пересчета одного ключа несколькими воркерами.
+
+    Значение хранится дольше своего срока годности: пока один воркер
+    пересчитывает устаревшее значение, остальные отдают старое. Незадолго
+    до истечения срока ключ может быть пересчитан заранее с вероятностью,
+    растущей по мере приближения срока (probabilistic early expiration).
+    """
+    if stale_timeout is None:
+        stale_timeout = settings.CACHE_STALE_TIMEOUT
+    entry = cache.get(key)
+    if entry is not None:
+        value, fresh_until, delta = entry
+        jitter = -delta * beta * math.log(1 - random.random())
+        if time.time() + jitter < fresh_until:
+            return value
+        if not cache.add(_lock_key(key), 1, LOCK_TIMEOUT):
+            return value
+        return _compute_once(key, compute, timeout, stale_timeout)
+
+    # Старого значения нет: ждем того, кто уже считает, но не дольше
+    # времени жизни его блокировки.
+    deadline = time.time() + LOCK_TIMEOUT
+    while not cache.add(_lock_key(key), 1, LOCK_TIMEOUT):
+        time.sleep(LOCK_WAIT)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry[0]
+        if time.time() > deadline:
+            return _store(key, compute, timeout, stale_timeout)
+    return _compute_once(key, compute, timeout, stale_timeout)
+
+
+# Номер правки ленты входит в ключи фрагментов: после изменения ленты
+# устаревают сразу все ее страницы, а не только первая.
+def index_page_key(page_number=1):
+    return make_template_fragment_key(
+        'index_page', [page_number, feed_generation('index')]
+    )
+
+
+def group_page_key(slug, page_number=1):
+    return make_template_fragment_key(
+        'group_page', [slug, page_number, feed_generation(f'group:{slug}')]
+    )
+
+
+def profile_page_key(username, page_number=1):
+    return make_template_fragment_key(
+        'profile_page',
+        [username, page_number, feed_generation(f'profile:{username}')]
+    )
+
+
+def post_item_key(post, comment_count, group_none=False):
+    """Ключ зависит от версии поста и числа комментариев, поэтому правка
+    сразу меняет ключ. Старую версию, прочитанную до коммита или с
+    отстающей реплики, никто больше не запросит."""
+    version = int(post.updated.timestamp() * 1000000)
+    return (
+        f'post_item:{post.pk}:{version}:{comment_count}:'
+        f'{int(bool(group_none))}'
+    )
+
+
+def _generation_key(scope):
+    return f'feed:gen:{scope}'
+
+
+def feed_generation(scope):
+    """Номер правки ленты. Меняется при любом изменении, которое не
+    сдвигает max(pub_date): правке поста, комментарии, подписке."""
+    key = _generation_key(scope)
+    # Начинаем со времени, а не с нуля: после вытеснения ключа из кеша
+    # номер не совпадет ни с одним из уже выданных клиентам.
+    cache.add(key, int(time.time()), None)
+    return cache.get(key)
+
+
+def feed_count_key(scope):
+    return f'feed:count:{scope}'
+
+
+def bump_feed_generation(scope):
+    try:
+        cache.incr(_generation_key(scope))
+    except ValueError:
+        feed_generation(scope)
+    # Лента могла уменьшиться: число постов (см. posts.pagination)
+    # пересчитается при следующем показе.
+    cache.delete(feed_count_key(scope))
+
+
+def invalidate_feeds(post):
+    bump_feed_generation('index')
+    bump_feed_generation(f'profile:{post.author.username}')
+    if post.group_id is not None:
+        bump_feed_generation(f'group:{post.group.slug}')
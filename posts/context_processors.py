@@ -0,0 +1,12 @@
+from django.utils.functional import SimpleLazyObject
+
+from .notifications import unread_count
+
+
+def notifications(request):
+    # Счетчик считается, только если шаблон его выводит.
+    return {
+        'unread_notifications': SimpleLazyObject(
+            lambda: unread_count(request.user)
+        ),
+    }
@@ -1,5 +1,6 @@
 from django import forms
 from django.contrib.auth import get_user_model
+from django.utils import timezone
 
 
 from .models import Post, Comment 
@@ -13,6 +14,21 @@ class PostForm(forms.ModelForm):
         fields = ['text', 'group', 'image']
 
 
+class ScheduleForm(forms.Form):
+    publish_at = forms.DateTimeField(
+        label='Опубликовать в',
+        required=False,
+        help_text='Оставьте пустым, чтобы опубликовать сразу. '
+                  'Формат: ГГГГ-ММ-ДД ЧЧ:ММ',
+    )
+
+    def clean_publish_at(self):
+        publish_at = self.cleaned_data['publish_at']
+        if publish_at is not None and publish_at <= timezone.now():
+            return None
+        return publish_at
+
+
 class CommentForm(forms.ModelForm):
     class Meta:
         model = Comment
@@ -0,0 +1,116 @@
+from django.conf import settings
+from django.db.models import F, Min
+from django.utils import timezone
+
+from jobs.queue import enqueue, job
+
+from .cache import invalidate_feeds
+from .live import publish
+from .models import Comment, Follow, Notification, Post
+from .notifications import notify
+
+PUBLISH_BATCH = 100
+
+
+@job
+def invalidate_post_feeds(post_id):
+    # Удаленный пост тоже должен пропасть из лент.
+    post = Post.all_objects.select_related('author', 'group').filter(
+        pk=post_id
+    ).first()
+    if post is not None:
+        invalidate_feeds(post)
+
+
+def schedule_publication(publish_at):
+    delay = (publish_at - timezone.now()).total_seconds()
+    enqueue(
+        publish_due_posts,
+        delay=max(delay, 0),
+        dedup_key=f'publish-posts:{publish_at:%Y%m%d%H%M%S}'
+    )
+
+
+def schedule_next_publication():
+    """Ставит задачу на время ближайшего запланированного поста, чтобы
+    потерянная задача не оставила его неопубликованным навсегда. В режиме
+    JOBS_EAGER задача выполнилась бы сразу, там посты публикует
+    команда publish_posts --interval."""
+    if settings.JOBS_EAGER:
+        return
+    next_at = Post.all_objects.filter(
+        published=False,
+        deleted_at__isnull=True,
+    ).aggregate(next_at=Min('publish_at'))['next_at']
+    if next_at is not None:
+        schedule_publication(next_at)
+
+
+@job
+def publish_due_posts():
+    """Публикует запланированные посты, время которых пришло, пачками.
+    Выборка идет по частичному индексу неопубликованных постов, поэтому
+    не зависит от размера таблицы."""
+    due = Post.all_objects.filter(
+        published=False,
+        deleted_at__isnull=True,
+        publish_at__lte=timezone.now(),
+    ).select_related('author', 'group').order_by('publish_at')
+    while True:
+        batch = list(due[:PUBLISH_BATCH])
+        if not batch:
+            schedule_next_publication()
+            return
+        Post.all_objects.filter(
+            pk__in=[post.pk for post in batch],
+            published=False,
+        ).update(
+            published=True, pub_date=F('publish_at'), updated=timezone.now()
+        )
+        for post in batch:
+            invalidate_feeds(post)
+            publish(post)
+            notify_post_mentions(post.pk)
+
+
+@job
+def notify_follow(follow_id):
+    follow = Follow.objects.filter(pk=follow_id).first()
+    if follow is not None:
+        notify(
+            [(follow.author_id, follow.user_id, Notification.FOLLOW, None)],
+            source=f'follow:{follow_id}',
+        )
+
+
+@job
+def notify_comment(comment_id):
+    comment = Comment.objects.select_related('post').filter(
+        pk=comment_id
+    ).first()
+    if comment is None:
+        return
+    events = [(
+        comment.post.author_id,
+        comment.author_id,
+        Notification.COMMENT,
+        comment.post_id,
+    )]
+    events.extend(
+        (user_id, comment.author_id, Notification.MENTION, comment.post_id)
+        for user_id in comment.mentions.values_list('pk', flat=True)
+    )
+    notify(events, source=f'comment:{comment_id}')
+
+
+@job
+def notify_post_mentions(post_id):
+    post = Post.objects.filter(pk=post_id).first()
+    if post is not None:
+        notify(
+            (
+                (user_id, post.author_id, Notification.MENTION, post.pk)
+                for user_id in post.mentions.values_list('pk', flat=True)
+            ),
+            source=f'post:{post_id}',
+        )
@@ -0,0 +1,63 @@
+"""Live feed notifications for the server-sent events endpoint.
+
+New posts are appended to a short event log in the shared cache, so every
+worker process sees them. The endpoint never holds a connection open: it
+answers right away with the posts published since the client's
+Last-Event-ID, then closes. The ``retry`` field tells EventSource to
+reconnect after LIVE_RETRY_MS, so a worker thread is busy only for the
+request itself. All posts published between two polls arrive in one
+message. A client that fell too far behind gets a reset instead of a
+backlog.
+"""
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+
+SEQ_KEY = 'live:seq'
+
+
+def _event_key(seq):
+    return f'live:event:{seq}'
+
+
+def publish(post):
+    try:
+        seq = cache.incr(SEQ_KEY)
+    except ValueError:
+        # Счетчика еще нет или кеш его вытеснил.
+        cache.add(SEQ_KEY, 0, None)
+        seq = cache.incr(SEQ_KEY)
+    cache.set(
+        _event_key(seq),
+        {'id': post.pk, 'author_id': post.author_id},
+        settings.LIVE_EVENT_TIMEOUT
+    )
+
+
+def poll(since, authors=None):
+    """Посты, опубликованные после события since. Возвращает
+    (seq, ids, overflow); authors=None — все авторы."""
+    seq = cache.get(SEQ_KEY, 0)
+    if since is None or since > seq:
+        # Первый запрос клиента или кеш очищен и счетчик начался заново.
+        return seq, [], False
+    if seq - since > settings.LIVE_MAX_PENDING:
+        return seq, [], True
+    keys = [_event_key(s) for s in range(since + 1, seq + 1)]
+    ids = sorted(
+        event['id'] for event in cache.get_many(keys).values()
+        if authors is None or event['author_id'] in authors
+    )
+    return seq, ids, False
+
+
+def render_events(since, authors=None):
+    """Тело ответа text/event-stream для одного опроса."""
+    seq, ids, overflow = poll(since, authors)
+    message = f'retry: {settings.LIVE_RETRY_MS}\nid: {seq}\n'
+    if overflow:
+        message += 'event: reset\ndata: {}\n'
+    elif ids:
+        message += f'event: posts\ndata: {json.dumps({"ids": ids})}\n'
+    return message + '\n'
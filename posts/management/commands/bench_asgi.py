@@ -0,0 +1,103 @@
+import asyncio
+import io
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.core.wsgi import get_wsgi_application
+
+from posts.models import Post
+from yatube.asgi import WSGIToASGI
+from yatube.benchmarks import bench_database
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает синхронный WSGI-воркер с пулом потоков и ASGI-адаптер '
+        'при множестве медленных клиентов, одновременно запрашивающих ленту.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--clients', type=int, default=200)
+        parser.add_argument('--threads', type=int, default=8)
+        parser.add_argument(
+            '--delay', type=float, default=0.2,
+            help='Сколько секунд клиент передает тело запроса.'
+        )
+
+    def handle(self, *args, **options):
+        with bench_database():
+            author = User.objects.create_user('bench_author')
+            Post.objects.bulk_create(
+                Post(text=f'Пост {i}', author=author) for i in range(30)
+            )
+            wsgi = get_wsgi_application()
+            for label, runner in (
+                ('wsgi, thread per connection', self.run_wsgi),
+                ('asgi adapter', self.run_asgi),
+            ):
+                started = time.perf_counter()
+                statuses = runner(wsgi, options)
+                elapsed = time.perf_counter() - started
+                ok = sum(1 for status in statuses if status == 200)
+                self.stdout.write(
+                    f'{label:<30} {elapsed:7.2f} s total'
+                    f'  {options["clients"] / elapsed:8.1f} req/s'
+                    f'  {ok}/{options["clients"]} ok'
+                )
+
+    @staticmethod
+    def environ():
+        return {
+            'REQUEST_METHOD': 'GET', 'PATH_INFO': '/', 'QUERY_STRING': '',
+            'SERVER_NAME': 'localhost', 'SERVER_PORT': '80',
+            'CONTENT_LENGTH': '1', 'wsgi.url_scheme': 'http',
+            'wsgi.input': io.BytesIO(b'x'), 'wsgi.errors': sys.stderr,
+        }
+
+    def run_wsgi(self, wsgi, options):
+        # Синхронный сервер отдает соединение потоку целиком, включая
+        # время, пока клиент передает запрос (здесь это sleep).
+        def handle_connection(_):
+            status = []
+            time.sleep(options['delay'])
+            b''.join(wsgi(
+                self.environ(),
+                lambda s, h, e=None: status.append(int(s[:3]))
+            ))
+            return status[0]
+
+        with ThreadPoolExecutor(options['threads']) as pool:
+            return list(pool.map(handle_connection, range(options['clients'])))
+
+    def run_asgi(self, wsgi, options):
+        asgi = WSGIToASGI(wsgi, max_workers=options['threads'])
+        scope = {
+            'type': 'http', 'method': 'GET', 'path': '/',
+            'query_string': b'', 'headers': [], 'server': ('localhost', 80),
+        }
+
+        async def client():
+            status = []
+
+            async def receive():
+                await asyncio.sleep(options['delay'])
+                return {'type': 'http.request', 'body': b'x'}
+
+            async def send(message):
+                if message['type'] == 'http.response.start':
+                    status.append(message['status'])
+
+            await asgi(scope, receive, send)
+            return status[0]
+
+        async def main():
+            return await asyncio.gather(
+                *(client() for _ in range(options['clients']))
+            )
+
+        return asyncio.run(main())
@@ -0,0 +1,107 @@
+import os
+import socket
+import tempfile
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory
+from django.test.utils import override_settings
+from django.views.static import serve
+
+from yatube.media import serve_media
+
+IMAGE_NAME = 'posts/bench.jpg'
+
+
+class SocketSink:
+    """Пара сокетов, вторую половину которой вычитывает отдельный поток,
+    как это делал бы клиент."""
+
+    def __enter__(self):
+        self.sock, peer = socket.socketpair()
+        self.thread = threading.Thread(target=self.drain, args=(peer,))
+        self.thread.start()
+        return self
+
+    @staticmethod
+    def drain(peer):
+        with peer:
+            while peer.recv(1 << 20):
+                pass
+
+    def __exit__(self, *exc_info):
+        self.sock.close()
+        self.thread.join()
+
+    def copy(self, response):
+        sent = 0
+        for chunk in response.streaming_content:
+            self.sock.sendall(chunk)
+            sent += len(chunk)
+        response.close()
+        return sent
+
+    def sendfile(self, response):
+        file = response.file_to_stream
+        offset = file.tell()
+        remaining = int(response['Content-Length'])
+        while remaining:
+            sent = os.sendfile(self.sock.fileno(), file.fileno(), offset,
+                               remaining)
+            offset += sent
+            remaining -= sent
+        response.close()
+        return int(response['Content-Length'])
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает пропускную способность отдачи больших изображений '
+        'через django.views.static.serve и yatube.media.serve_media.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--size', type=int, default=20, help='МБ')
+        parser.add_argument('--requests', type=int, default=20)
+
+    def handle(self, *args, **options):
+        factory = RequestFactory()
+        with tempfile.TemporaryDirectory() as root, \
+                override_settings(MEDIA_ROOT=root, MEDIA_SENDFILE=None), \
+                SocketSink() as sink:
+            os.makedirs(os.path.join(root, 'posts'))
+            with open(os.path.join(root, IMAGE_NAME), 'wb') as f:
+                f.write(os.urandom(options['size'] << 20))
+
+            def static_serve(**headers):
+                request = factory.get('/media/' + IMAGE_NAME, **headers)
+                return serve(request, IMAGE_NAME, document_root=root)
+
+            def media_serve(**headers):
+                request = factory.get('/media/' + IMAGE_NAME, **headers)
+                return serve_media(request, IMAGE_NAME)
+
+            tail = {'HTTP_RANGE': 'bytes=-1048576'}
+            cases = (
+                ('static.serve, full', static_serve, {}, sink.copy),
+                ('serve_media, full, copy', media_serve, {}, sink.copy),
+                ('serve_media, full, sendfile', media_serve, {},
+                 sink.sendfile),
+                ('static.serve, last 1 MB', static_serve, tail, sink.copy),
+                ('serve_media, last 1 MB', media_serve, tail, sink.sendfile),
+            )
+            for label, view, headers, send in cases:
+                self.run_case(label, view, headers, send, options['requests'])
+
+    def run_case(self, label, view, headers, send, requests):
+        sent = 0
+        started = time.perf_counter()
+        for _ in range(requests):
+            sent += send(view(**headers))
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f'{label:<32} {elapsed / requests * 1000:8.2f} ms/request'
+            f'  {sent / elapsed / (1 << 20):9.1f} MB/s'
+            f'  {sent // requests:>10} bytes/request'
+        )
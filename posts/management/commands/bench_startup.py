@@ -0,0 +1,97 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+PROFILES = {
+    'dev': {'YATUBE_ENV': 'dev'},
+    'prod': {'YATUBE_ENV': 'prod'},
+    'prod-feed-only': {'YATUBE_ENV': 'prod', 'YATUBE_FEED_ONLY': '1'},
+}
+
+# Выполняется в отдельном процессе, чтобы импорт начинался с нуля.
+CHILD_SCRIPT = '''
+import io, json, sys, time
+started = time.perf_counter()
+from yatube.wsgi import application
+imported = time.perf_counter()
+status = []
+environ = {
+    "REQUEST_METHOD": "GET", "PATH_INFO": "/", "QUERY_STRING": "",
+    "SERVER_NAME": "localhost", "SERVER_PORT": "80",
+    "wsgi.url_scheme": "http", "wsgi.input": io.BytesIO(),
+    "wsgi.errors": sys.stderr,
+}
+body = b"".join(application(environ, lambda s, h, e=None: status.append(s)))
+responded = time.perf_counter()
+print(json.dumps({
+    "import": (imported - started) * 1000,
+    "first_response": (responded - imported) * 1000,
+    "status": status[0],
+    "modules": len(sys.modules),
+}))
+'''
+
+
+class Command(BaseCommand):
+    help = (
+        'Измеряет время от импорта WSGI-приложения до первого ответа '
+        'для профилей настроек dev, prod и prod без админки.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=5)
+
+    def handle(self, *args, **options):
+        with tempfile.TemporaryDirectory() as tmp:
+            env = dict(
+                os.environ,
+                DJANGO_SETTINGS_MODULE='yatube.settings',
+                YATUBE_DB_PATH=os.path.join(tmp, 'bench.sqlite3'),
+                YATUBE_CACHE_PATH=os.path.join(tmp, 'cache.sqlite3'),
+                YATUBE_STATIC_ROOT=os.path.join(tmp, 'static'),
+                YATUBE_SECRET_KEY='bench',
+                YATUBE_ALLOWED_HOSTS='localhost',
+            )
+            subprocess.run(
+                [sys.executable, 'manage.py', 'migrate', '-v', '0'],
+                cwd=settings.BASE_DIR, env=env, check=True,
+            )
+            # Prod-профили берут статику из манифеста collectstatic.
+            subprocess.run(
+                [sys.executable, 'manage.py', 'collectstatic', '--noinput',
+                 '-v', '0'],
+                cwd=settings.BASE_DIR, env=dict(env, YATUBE_ENV='prod'),
+                check=True,
+            )
+            for name, overrides in PROFILES.items():
+                self.run_profile(name, dict(env, **overrides), options['runs'])
+
+    def run_profile(self, name, env, runs):
+        results = []
+        for _ in range(runs):
+            child = subprocess.run(
+                [sys.executable, '-c', CHILD_SCRIPT],
+                cwd=settings.BASE_DIR, env=env,
+                stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+            )
+            if child.returncode:
+                lines = child.stderr.decode(errors='replace').splitlines()
+                return self.failed(name, lines[-1] if lines else 'no output')
+            result = json.loads(child.stdout)
+            if not result['status'].startswith('200'):
+                return self.failed(name, f"status {result['status']}")
+            results.append(result)
+        best = min(results, key=lambda r: r['import'] + r['first_response'])
+        self.stdout.write(
+            f"{name:<16} import {best['import']:8.1f} ms"
+            f"  first response {best['first_response']:8.1f} ms"
+            f"  modules {best['modules']:5d}  status {best['status']}"
+        )
+
+    def failed(self, name, reason):
+        self.stdout.write(self.style.ERROR(f'{name:<16} failed: {reason}'))
@@ -0,0 +1,140 @@
+import glob
+import hashlib
+import json
+import os
+from html import escape
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from yatube.profiling import FOLDED_SUFFIX, read_folded
+
+WIDTH = 1200
+FRAME_HEIGHT = 16
+MIN_WIDTH = 0.1
+
+
+def build_tree(stacks):
+    root = {'name': 'all', 'value': 0, 'children': {}}
+    for stack, count in stacks.items():
+        root['value'] += count
+        node = root
+        for name in stack.split(';'):
+            node = node['children'].setdefault(
+                name, {'name': name, 'value': 0, 'children': {}}
+            )
+            node['value'] += count
+    return root
+
+
+def tree_depth(node):
+    return 1 + max(map(tree_depth, node['children'].values()), default=0)
+
+
+def color(name):
+    # Стабильный «теплый» цвет: одна функция — один цвет на всех графиках.
+    digest = hashlib.md5(name.encode()).digest()
+    return f'rgb({205 + digest[0] % 50},{digest[1] % 200},{digest[2] % 55})'
+
+
+def render_svg(stacks, title):
+    root = build_tree(stacks)
+    height = (tree_depth(root) + 2) * FRAME_HEIGHT
+    scale = WIDTH / root['value']
+    rects = []
+
+    def draw(node, x, depth):
+        width = node['value'] * scale
+        if width < MIN_WIDTH:
+            return
+        y = height - (depth + 1) * FRAME_HEIGHT
+        share = node['value'] / root['value'] * 100
+        label = escape(node['name'])
+        chars = int(width / 7)
+        text = label if len(label) <= chars else label[:chars - 2] + '..'
+        rects.append(
+            f'<g><title>{label} ({node["value"]} samples, {share:.2f}%)'
+            f'</title><rect x="{x:.2f}" y="{y}" width="{width:.2f}" '
+            f'height="{FRAME_HEIGHT - 1}" fill="{color(node["name"])}"/>'
+            + (
+                f'<text x="{x + 3:.2f}" y="{y + FRAME_HEIGHT - 4}">{text}'
+                '</text>' if chars > 3 else ''
+            )
+            + '</g>'
+        )
+        for child in node['children'].values():
+            draw(child, x, depth + 1)
+            x += child['value'] * scale
+
+    draw(root, 0, 0)
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{WIDTH}" '
+        f'height="{height}" font-family="monospace" font-size="11">'
+        f'<text x="{WIDTH / 2}" y="{FRAME_HEIGHT}" text-anchor="middle">'
+        f'{escape(title)}</text>' + ''.join(rects) + '</svg>'
+    )
+
+
+def render_speedscope(stacks, title):
+    frames, index = [], {}
+    samples, weights = [], []
+    for stack, count in stacks.items():
+        sample = []
+        for name in stack.split(';'):
+            if name not in index:
+                index[name] = len(frames)
+                frames.append({'name': name})
+            sample.append(index[name])
+        samples.append(sample)
+        weights.append(count)
+    return json.dumps({
+        '$schema': 'https://www.speedscope.app/file-format-schema.json',
+        'shared': {'frames': frames},
+        'profiles': [{
+            'type': 'sampled',
+            'name': title,
+            'unit': 'none',
+            'startValue': 0,
+            'endValue': sum(weights),
+            'samples': samples,
+            'weights': weights,
+        }],
+    })
+
+
+class Command(BaseCommand):
+    help = (
+        'Объединяет профили запросов из PROFILING_DIR (см. '
+        'yatube.profiling) в flame graph SVG или профиль speedscope.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'view', nargs='?', help='Имя view, например profile. '
+                                    'Без него — все view вместе.'
+        )
+        parser.add_argument(
+            '--format', choices=('svg', 'speedscope'), default='svg'
+        )
+        parser.add_argument('--output', '-o', required=True)
+
+    def handle(self, *args, **options):
+        if not settings.PROFILING_DIR:
+            raise CommandError('PROFILING_DIR не задан.')
+        view = options['view'] or '*'
+        paths = glob.glob(os.path.join(
+            settings.PROFILING_DIR, view, '*' + FOLDED_SUFFIX
+        ))
+        stacks = read_folded(paths)
+        if not stacks:
+            raise CommandError(f'Нет профилей для {view}.')
+        title = f'{options["view"] or "все view"}: {len(paths)} запросов'
+        render = (
+            render_svg if options['format'] == 'svg' else render_speedscope
+        )
+        with open(options['output'], 'w') as f:
+            f.write(render(stacks, title))
+        self.stdout.write(
+            f'{len(paths)} профилей, {sum(stacks.values())} сэмплов '
+            f'-> {options["output"]}'
+        )
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from yatube.profiling import make_token
+
+
+class Command(BaseCommand):
+    help = (
+        'Выдает подписанный токен для заголовка X-Profile: запрос с ним '
+        'профилируется независимо от PROFILING_SAMPLE_RATE.'
+    )
+
+    def handle(self, *args, **options):
+        self.stdout.write(make_token())
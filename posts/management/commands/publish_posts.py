@@ -0,0 +1,26 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from posts.jobs import publish_due_posts
+
+
+class Command(BaseCommand):
+    help = (
+        'Публикует запланированные посты, время которых пришло. Обычно это '
+        'делает задача из очереди; команда нужна для cron и режима '
+        'JOBS_EAGER, в котором отложенные задачи не ждут своего времени. '
+        'С --interval N команда проверяет посты каждые N секунд, пока ее '
+        'не остановят: так в разработке запланированные посты публикуются '
+        'без воркера.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=int, default=0)
+
+    def handle(self, *args, **options):
+        while True:
+            publish_due_posts()
+            if not options['interval']:
+                return
+            time.sleep(options['interval'])
@@ -0,0 +1,34 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from posts.models import Post
+
+
+class Command(BaseCommand):
+    help = (
+        'Окончательно удаляет посты, удаленные мягко больше --days дней '
+        'назад, вместе с комментариями и версиями. Удаляет пачками, чтобы '
+        'не держать долгую блокировку.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=30)
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        expired = Post.all_objects.filter(deleted_at__lt=cutoff)
+        purged = 0
+        while True:
+            batch = list(
+                expired.order_by().values_list('pk', flat=True)[
+                    :options['batch_size']
+                ]
+            )
+            if not batch:
+                break
+            Post.all_objects.filter(pk__in=batch).delete()
+            purged += len(batch)
+        self.stdout.write(f'Удалено постов: {purged}')
@@ -0,0 +1,51 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from posts.cache import invalidate_feeds
+from posts.markup import index_markup, prepare
+from posts.models import Comment, Post
+
+
+class Command(BaseCommand):
+    help = (
+        'Заполняет text_html, теги и упоминания у постов и комментариев, '
+        'сохраненных до их появления. С --all пересчитывает все строки.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true')
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        for model, queryset in (
+            (Post, Post.all_objects.select_related('author', 'group')),
+            (Comment, Comment.objects.all()),
+        ):
+            if not options['all']:
+                queryset = queryset.filter(text_html='')
+            done = self.backfill(queryset, options['batch_size'])
+            self.stdout.write(f'{model._meta.verbose_name_plural}: {done}')
+
+    @staticmethod
+    def backfill(queryset, batch_size):
+        # Идем по pk, а не по OFFSET: заполненные строки выпадают из
+        # выборки, и смещение пропускало бы незаполненные.
+        done = 0
+        last_pk = 0
+        queryset = queryset.order_by('pk')
+        while True:
+            batch = list(queryset.filter(pk__gt=last_pk)[:batch_size])
+            if not batch:
+                return done
+            with transaction.atomic():
+                for instance in batch:
+                    prepare(instance)
+                    if isinstance(instance, Post):
+                        # Новый updated меняет ключ кеша post_item.
+                        instance.save(update_fields=('text_html', 'updated'))
+                        invalidate_feeds(instance)
+                    else:
+                        instance.save(update_fields=('text_html',))
+                    index_markup(instance)
+            last_pk = batch[-1].pk
+            done += len(batch)
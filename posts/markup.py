@@ -0,0 +1,77 @@
+"""Hashtags and @mentions in post and comment text.
+
+Tags and mentions are extracted once, when the text is saved, into
+indexed tables. The text of posts and comments is also rendered to
+escaped HTML at the same time, so feeds output stored markup instead of
+escaping and re-parsing it on every render. Rows saved before that are
+filled in by the ``render_text_html`` command.
+"""
+import re
+
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.utils.html import escape
+from django.utils.text import normalize_newlines
+
+TOKEN_RE = re.compile(
+    r'(?<![\w#])#(?P<tag>\w{1,50})'
+    r'|(?<![\w@])@(?P<mention>[\w.+-]{0,149}\w)'
+)
+
+
+def extract(text):
+    """Возвращает (теги, имена пользователей), упомянутые в тексте.
+    Теги приводятся к нижнему регистру."""
+    tags, mentions = set(), set()
+    for match in TOKEN_RE.finditer(text):
+        if match.group('tag'):
+            tags.add(match.group('tag').lower())
+        else:
+            mentions.add(match.group('mention'))
+    return tags, mentions
+
+
+def render_text(text, usernames):
+    """HTML текста со ссылками на теги и на профили из usernames.
+    Упоминания несуществующих пользователей остаются текстом."""
+    text = normalize_newlines(text)
+    parts = []
+    position = 0
+    for match in TOKEN_RE.finditer(text):
+        parts.append(escape(text[position:match.start()]))
+        position = match.end()
+        tag, mention = match.group('tag'), match.group('mention')
+        if tag:
+            url = reverse('tag_posts', args=[tag.lower()])
+        elif mention in usernames:
+            url = reverse('profile', args=[mention])
+        else:
+            parts.append(escape(match.group()))
+            continue
+        parts.append(f'<a href="{url}">{escape(match.group())}</a>')
+    parts.append(escape(text[position:]))
+    return ''.join(parts).replace('\n', '<br>')
+
+
+def prepare(instance):
+    """Заполняет text_html и запоминает найденных пользователей для
+    index_markup. Вызывается перед сохранением."""
+    tags, mentions = extract(instance.text)
+    users = list(get_user_model().objects.filter(username__in=mentions))
+    instance.text_html = render_text(
+        instance.text, {user.username for user in users}
+    )
+    instance._markup = (tags, users)
+
+
+def index_markup(instance):
+    """Записывает теги и упоминания сохраненного объекта в таблицы."""
+    from .models import Tag
+
+    tags, users = getattr(instance, '_markup', None) or (set(), [])
+    if hasattr(instance, 'tags'):
+        Tag.objects.bulk_create(
+            [Tag(name=name) for name in tags], ignore_conflicts=True
+        )
+        instance.tags.set(Tag.objects.filter(name__in=tags))
+    instance.mentions.set(users)
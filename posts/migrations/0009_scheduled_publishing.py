@@ -0,0 +1,51 @@
+# Generated by Django 2.2.6 on 2026-10-19 09:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0008_post_revisions_soft_delete'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='post',
+            name='posts_post_visible_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='post',
+            name='posts_post_group_visible_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='post',
+            name='posts_post_author_visible_idx',
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='publish_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Опубликовать в'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='published',
+            field=models.BooleanField(default=True, verbose_name='Опубликован'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', True), ('published', True)), fields=['-pub_date'], name='posts_post_visible_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', True), ('published', True)), fields=['group', '-pub_date'], name='posts_post_group_visible_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', True), ('published', True)), fields=['author', '-pub_date'], name='posts_post_author_visible_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(condition=models.Q(published=False), fields=['publish_at'], name='posts_post_scheduled_idx'),
+        ),
+    ]
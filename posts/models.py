@@ -1,5 +1,9 @@
 from django.contrib.auth import get_user_model
 from django.db import models
+from django.db.models import Q
+from django.utils import timezone
+
+from .markup import index_markup, prepare
 
 User = get_user_model()
  
@@ -21,9 +25,51 @@ class Group(models.Model):
     def __str__(self):
         return self.title
  
- 
-class Post(models.Model):
+
+
+VISIBLE = Q(deleted_at__isnull=True, published=True)
+
+
+class Tag(models.Model):
+    name = models.CharField('Тег', max_length=50, unique=True)
+
+    class Meta:
+        verbose_name = ('Тег')
+        verbose_name_plural = ('Теги')
+
+    def __str__(self):
+        return f"#{self.name}"
+
+
+class MarkupMixin:
+    """Рендерит text_html и записывает теги и упоминания при каждом
+    сохранении текста, откуда бы оно ни шло: форма, админка, shell."""
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        rendered = update_fields is None or 'text' in update_fields
+        if rendered:
+            prepare(self)
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'text_html'}
+        super().save(*args, **kwargs)
+        if rendered:
+            index_markup(self)
+
+
+class VisiblePostManager(models.Manager):
+    def get_queryset(self):
+        return super().get_queryset().filter(VISIBLE)
+
+
+class Post(MarkupMixin, models.Model):
     text = models.TextField(verbose_name='Текст')
+    # Заполняется из text при сохранении (см. MarkupMixin).
+    text_html = models.TextField(
+        'Текст в HTML', 
+        blank=True, 
+        editable=False
+    )
     pub_date = models.DateTimeField(
         "Дата и время публикации", 
         auto_now_add=True,
@@ -49,6 +95,36 @@ class Post(models.Model):
         blank=True, 
         null=True
     ) 
+    tags = models.ManyToManyField(
+        Tag,
+        related_name='posts',
+        verbose_name='Теги',
+        blank=True,
+    )
+    mentions = models.ManyToManyField(
+        User,
+        related_name='post_mentions',
+        verbose_name='Упоминания',
+        blank=True,
+    )
+    deleted_at = models.DateTimeField(
+        'Дата и время удаления',
+        blank=True,
+        null=True,
+    )
+    published = models.BooleanField('Опубликован', default=True)
+    publish_at = models.DateTimeField(
+        'Опубликовать в',
+        blank=True,
+        null=True,
+    )
+    # Входит в ключ кеша разметки поста (см. posts.cache.post_item_key).
+    updated = models.DateTimeField('Дата и время изменения', auto_now=True)
+
+    # Первый менеджер — менеджер по умолчанию: ленты, related-менеджеры
+    # (author.posts, group.posts) и get_object_or_404 не видят удаленного.
+    objects = VisiblePostManager()
+    all_objects = models.Manager()
 
     class Meta:
         verbose_name = ('Пост')
@@ -56,12 +132,71 @@ class Post(models.Model):
         ordering = (
             "-pub_date",
         )
+        # MAX(pub_date) и первая страница ленты группы или автора
+        # читаются по индексу без сортировки. Индексы частичные: удаленные
+        # и запланированные посты в них не попадают и не раздувают их.
+        indexes = (
+            models.Index(
+                fields=('-pub_date',),
+                name='posts_post_visible_idx',
+                condition=VISIBLE,
+            ),
+            models.Index(
+                fields=('group', '-pub_date'),
+                name='posts_post_group_visible_idx',
+                condition=VISIBLE,
+            ),
+            models.Index(
+                fields=('author', '-pub_date'),
+                name='posts_post_author_visible_idx',
+                condition=VISIBLE,
+            ),
+            # Очередь публикации: только неопубликованные посты.
+            models.Index(
+                fields=('publish_at',),
+                name='posts_post_scheduled_idx',
+                condition=Q(published=False),
+            ),
+            # Для purge_deleted_posts.
+            models.Index(
+                fields=('deleted_at',),
+                name='posts_post_deleted_idx',
+                condition=Q(deleted_at__isnull=False),
+            ),
+        )
 
     def __str__(self):
        return f"{self.author}, {self.text[:20]}..."
 
+    def soft_delete(self):
+        self.deleted_at = timezone.now()
+        self.save(update_fields=('deleted_at',))
 
-class Comment(models.Model):
+
+class PostRevision(models.Model):
+    """Предыдущая версия поста. Таблица только пополняется."""
+    post = models.ForeignKey(
+        Post, 
+        on_delete=models.CASCADE, 
+        related_name='revisions',
+        verbose_name='Пост',
+    )
+    text = models.TextField(verbose_name='Текст')
+    image = models.CharField('Изображение', max_length=100, blank=True)
+    created = models.DateTimeField('Дата и время правки', auto_now_add=True)
+
+    class Meta:
+        verbose_name = ('Версия поста')
+        verbose_name_plural = ('Версии постов')
+        ordering = (
+            "-created",
+        )
+
+    def __str__(self):
+        return f"{self.post_id}, {self.created}"
+
+
+class Comment(MarkupMixin, models.Model):
     post = models.ForeignKey(
         Post, 
         on_delete=models.CASCADE, 
@@ -75,11 +210,22 @@ class Comment(models.Model):
         verbose_name='Автор',
     )
     text = models.TextField(verbose_name='Текст коментария')
+    text_html = models.TextField(
+        'Текст в HTML', 
+        blank=True, 
+        editable=False
+    )
     created = models.DateTimeField(
         'Дата и время публикации', 
         auto_now_add=True, 
         db_index=True
     )
+    mentions = models.ManyToManyField(
+        User,
+        related_name='comment_mentions',
+        verbose_name='Упоминания',
+        blank=True,
+    )
 
     class Meta:
         verbose_name = ('Коммент')
@@ -107,3 +253,70 @@ class Follow(models.Model):
     class Meta:
         verbose_name = ('Подписка')
         verbose_name_plural = ('Подписки')
+
+
+class Notification(models.Model):
+    FOLLOW = 'follow'
+    COMMENT = 'comment'
+    MENTION = 'mention'
+    VERB_CHOICES = (
+        (FOLLOW, 'подписался на вас'),
+        (COMMENT, 'прокомментировал ваш пост'),
+        (MENTION, 'упомянул вас'),
+    )
+
+    recipient = models.ForeignKey(
+        User, 
+        on_delete=models.CASCADE, 
+        related_name='notifications',
+        verbose_name='Получатель',
+    )
+    actor = models.ForeignKey(
+        User, 
+        on_delete=models.CASCADE, 
+        related_name='+',
+        verbose_name='Автор события',
+    )
+    verb = models.CharField('Событие', max_length=10, choices=VERB_CHOICES)
+    post = models.ForeignKey(
+        Post, 
+        on_delete=models.CASCADE, 
+        related_name='+',
+        verbose_name='Пост',
+        blank=True, 
+        null=True,
+    )
+    # Сколько одинаковых событий схлопнуто в это уведомление.
+    count = models.PositiveIntegerField('Событий', default=1)
+    read = models.BooleanField('Прочитано', default=False)
+    created = models.DateTimeField('Дата и время', auto_now_add=True)
+
+    class Meta:
+        verbose_name = ('Уведомление')
+        verbose_name_plural = ('Уведомления')
+        ordering = (
+            "-id",
+        )
+        indexes = (
+            # Входящие постранично по курсору id.
+            models.Index(fields=('recipient', '-id')),
+        )
+        # Одно непрочитанное уведомление на отправителя, действие и пост:
+        # повторы увеличивают count (см. posts.notifications.notify).
+        # NULL в уникальном индексе не совпадает с NULL, поэтому подписки
+        # без поста ограничены отдельно.
+        constraints = (
+            models.UniqueConstraint(
+                fields=('recipient', 'actor', 'verb', 'post'),
+                name='posts_notification_unread_uniq',
+                condition=Q(read=False, post__isnull=False),
+            ),
+            models.UniqueConstraint(
+                fields=('recipient', 'actor', 'verb'),
+                name='posts_notification_unread_nopost_uniq',
+                condition=Q(read=False, post__isnull=True),
+            ),
+        )
+
+    def __str__(self):
+        return f"{self.actor} {self.get_verb_display()} ({self.recipient})"
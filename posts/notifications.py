@@ -0,0 +1,114 @@
+"""Notifications about follows, comments and mentions.
+
+Events are written in bulk: duplicates inside one batch are merged, and
+an event that repeats an unread notification only raises its count. A
+partial unique index keeps one unread row per recipient, actor, verb and
+post, so concurrent workers cannot create duplicates. The loser of an
+insert race retries and updates the winner's row. A job passes its
+source event, so a retried job does not count the same event twice.
+
+Each user's unread counter is cached and dropped whenever their inbox
+changes.
+"""
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import Case, F, PositiveIntegerField, Value, When
+
+from .models import Notification
+
+WRITE_ATTEMPTS = 3
+
+
+def unread_key(user_id):
+    return f'notifications:unread:{user_id}'
+
+
+def unread_count(user):
+    if not user.is_authenticated:
+        return 0
+    key = unread_key(user.pk)
+    count = cache.get(key)
+    if count is None:
+        count = user.notifications.filter(read=False).count()
+        cache.set(key, count, settings.NOTIFICATIONS_COUNT_TIMEOUT)
+    return count
+
+
+def _source_key(source):
+    return f'notifications:source:{source}'
+
+
+def _write(events):
+    existing = dict(
+        ((recipient_id, actor_id, verb, post_id), pk)
+        for pk, recipient_id, actor_id, verb, post_id
+        in Notification.objects.select_for_update().filter(
+            read=False,
+            recipient_id__in={event[0] for event in events},
+            actor_id__in={event[1] for event in events},
+            verb__in={event[2] for event in events},
+        ).values_list('pk', 'recipient_id', 'actor_id', 'verb', 'post_id')
+    )
+    increments = {}
+    new = []
+    for event, count in events.items():
+        if event in existing:
+            increments[existing[event]] = count
+            continue
+        recipient_id, actor_id, verb, post_id = event
+        new.append(Notification(
+            recipient_id=recipient_id,
+            actor_id=actor_id,
+            verb=verb,
+            post_id=post_id,
+            count=count,
+        ))
+    if increments:
+        Notification.objects.filter(pk__in=increments).update(
+            count=F('count') + Case(
+                *[When(pk=pk, then=Value(count))
+                  for pk, count in increments.items()],
+                output_field=PositiveIntegerField(),
+            )
+        )
+    Notification.objects.bulk_create(
+        new, batch_size=settings.NOTIFICATIONS_BATCH
+    )
+
+
+def notify(events, source=None):
+    """Записывает события (recipient_id, actor_id, verb, post_id).
+    О собственных действиях пользователь уведомлений не получает.
+
+    source — событие-источник, например 'comment:5': повторный вызов
+    с тем же source (перезапуск задачи) ничего не делает."""
+    if source is not None and cache.get(_source_key(source)):
+        return
+    events = Counter(event for event in events if event[0] != event[1])
+    if events:
+        for attempt in range(WRITE_ATTEMPTS):
+            try:
+                with transaction.atomic():
+                    _write(events)
+                break
+            except IntegrityError:
+                # Такое же непрочитанное уведомление только что вставил
+                # другой воркер: на следующем круге оно будет обновлено.
+                if attempt == WRITE_ATTEMPTS - 1:
+                    raise
+        cache.delete_many([unread_key(event[0]) for event in events])
+    if source is not None:
+        cache.set(
+            _source_key(source), 1, settings.NOTIFICATIONS_SOURCE_TIMEOUT
+        )
+
+
+def mark_read(user, notification_ids):
+    if notification_ids:
+        user.notifications.filter(
+            pk__in=notification_ids, read=False
+        ).update(read=True)
+        cache.delete(unread_key(user.pk))
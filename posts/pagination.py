@@ -0,0 +1,96 @@
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db import connections
+
+from .cache import feed_count_key
+
+
+def estimate_count(queryset):
+    """Оценка числа строк по плану запроса. Есть только у PostgreSQL,
+    для остальных баз возвращает None."""
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return None
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute('EXPLAIN (FORMAT JSON) ' + sql, params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+def feed_count(scope, queryset, per_page):
+    """Число постов ленты для пагинатора.
+
+    Небольшие ленты считаются точно, но COUNT(*) ограничен
+    FEED_EXACT_COUNT + 1 строками. Для больших лент число берется из кеша,
+    а при промахе — из оценки планировщика или COUNT(*), ограниченного
+    FEED_MAX_PAGES страницами. Неточность в большой ленте сказывается
+    только на номере последней страницы."""
+    key = feed_count_key(scope)
+    cached = cache.get(key)
+    if cached is not None and cached > settings.FEED_EXACT_COUNT:
+        return cached
+    cap = per_page * settings.FEED_MAX_PAGES
+    count = queryset[:settings.FEED_EXACT_COUNT + 1].count()
+    if count <= settings.FEED_EXACT_COUNT:
+        return min(count, cap)
+    count = estimate_count(queryset)
+    if count is None:
+        count = queryset[:cap].count()
+    count = min(count, cap)
+    cache.set(key, count, settings.FEED_COUNT_TIMEOUT)
+    return count
+
+
+def paginate(request, object_list, per_page, scope):
+    """Paginator и текущая страница ленты без полного COUNT(*) на каждый
+    запрос (см. feed_count). Глубже FEED_MAX_PAGES страниц ленту не
+    листают."""
+    paginator = Paginator(object_list, per_page)
+    paginator.count = feed_count(scope, object_list, per_page)
+    return paginator, paginator.get_page(request.GET.get('page'))
+
+
+def cursor_page(queryset, cursor, per_page):
+    """Страница записей с id меньше cursor, от новых к старым, и курсор
+    следующей страницы (None, если она последняя). Без COUNT и OFFSET:
+    стоимость не зависит от глубины."""
+    try:
+        cursor = int(cursor)
+    except (TypeError, ValueError):
+        cursor = None
+    if cursor is not None:
+        queryset = queryset.filter(pk__lt=cursor)
+    items = list(queryset.order_by('-pk')[:per_page + 1])
+    next_cursor = items[per_page - 1].pk if len(items) > per_page else None
+    return items[:per_page], next_cursor
+
+
+def page_window(page, on_each_side=2, on_ends=1):
+    """Номера страниц для переключателя: первые и последние on_ends и
+    on_each_side вокруг текущей. None обозначает пропуск. Длина списка не
+    зависит от числа страниц."""
+    number = page.number
+    num_pages = page.paginator.num_pages
+    if num_pages <= (on_each_side + on_ends) * 2 + 1:
+        return list(range(1, num_pages + 1))
+
+    window = []
+    if number > on_each_side + on_ends + 2:
+        window.extend(range(1, on_ends + 1))
+        window.append(None)
+        window.extend(range(number - on_each_side, number + 1))
+    else:
+        window.extend(range(1, number + 1))
+    if number < num_pages - on_each_side - on_ends - 1:
+        window.extend(range(number + 1, number + on_each_side + 1))
+        window.append(None)
+        window.extend(range(num_pages - on_ends + 1, num_pages + 1))
+    else:
+        window.extend(range(number + 1, num_pages + 1))
+    return window
@@ -0,0 +1,37 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .cache import bump_feed_generation, invalidate_feeds
+from .live import publish
+from .models import Group, Post
+
+
+@receiver(post_save, sender=Post)
+def announce_new_post(sender, instance, created, **kwargs):
+    # Запланированные посты анонсирует publish_due_posts.
+    if created and instance.published:
+        transaction.on_commit(lambda: publish(instance))
+
+
+@receiver(post_delete, sender=Post)
+def forget_deleted_post(sender, instance, **kwargs):
+    # Удаление не сдвигает max(pub_date), поэтому меняем номер правки лент.
+    # Посты, удаленные раньше мягко, из лент уже убраны.
+    if instance.deleted_at is None:
+        invalidate_feeds(instance)
+
+
+@receiver(post_save, sender=Group)
+def touch_group_posts(sender, instance, created, **kwargs):
+    # Название группы выводится в разметке каждого ее поста.
+    if not created:
+        posts = Post.all_objects.filter(group=instance)
+        posts.update(updated=timezone.now())
+        # Кешированные ленты держат старую разметку постов целиком.
+        bump_feed_generation('index')
+        bump_feed_generation(f'group:{instance.slug}')
+        authors = posts.values_list('author__username', flat=True).distinct()
+        for username in authors:
+            bump_feed_generation(f'profile:{username}')
@@ -0,0 +1,123 @@
+from django import template
+from django.conf import settings
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+from django.db.models import Count
+from django.template.loader import get_template
+from django.utils.safestring import mark_safe
+
+from posts.cache import get_or_compute, post_item_key
+from posts.models import Comment
+from posts.pagination import page_window as window
+from yatube.esi import owner_block
+
+register = template.Library()
+
+
+@register.simple_tag
+def post_items(posts, group_none=False):
+    """Разметка списка постов. Готовые post_item.html берутся из кеша
+    одним get_many, недостающие рендерятся и кладутся одним set_many.
+
+    Разметка не зависит от пользователя: кнопка редактирования выводится
+    через {% owner_only %}, поэтому один вариант подходит всем."""
+    posts = list(posts)
+    counts = dict(
+        Comment.objects.filter(post__in=posts)
+        .values_list('post')
+        .annotate(Count('pk'))
+        .order_by()
+    )
+    items = {
+        post_item_key(post, counts.get(post.pk, 0), group_none): post
+        for post in posts
+    }
+    cached = cache.get_many(list(items))
+    rendered = {}
+    template = get_template('post_item.html')
+    for key, post in items.items():
+        if key not in cached:
+            rendered[key] = template.render({
+                'post': post,
+                'comment_count': counts.get(post.pk, 0),
+                'group_none': group_none,
+            })
+    if rendered:
+        cache.set_many(rendered, settings.POST_ITEM_CACHE_TIMEOUT)
+    cached.update(rendered)
+    return mark_safe(''.join(cached[key] for key in items))
+
+
+@register.simple_tag
+def post_item(post, group_none=False):
+    return post_items([post], group_none)
+
+
+@register.simple_tag
+def page_window(page):
+    return window(page)
+
+
+class FragmentCacheNode(template.Node):
+    def __init__(self, nodelist, expire_time, fragment_name, vary_on):
+        self.nodelist = nodelist
+        self.expire_time = expire_time
+        self.fragment_name = fragment_name
+        self.vary_on = vary_on
+
+    def render(self, context):
+        expire_time = int(self.expire_time.resolve(context))
+        vary_on = [var.resolve(context) for var in self.vary_on]
+        key = make_template_fragment_key(self.fragment_name, vary_on)
+        return get_or_compute(
+            key,
+            lambda: self.nodelist.render(context),
+            expire_time
+        )
+
+
+@register.tag
+def cache_fragment(parser, token):
+    """Как {% cache %}, но с защитой от одновременного пересчета:
+    {% cache_fragment 20 index_page [var1 var2 ...] %}"""
+    nodelist = parser.parse(('endcache_fragment',))
+    parser.delete_first_token()
+    tokens = token.split_contents()
+    if len(tokens) < 3:
+        raise template.TemplateSyntaxError(
+            f"'{tokens[0]}' tag requires at least 2 arguments."
+        )
+    return FragmentCacheNode(
+        nodelist,
+        parser.compile_filter(tokens[1]),
+        tokens[2],
+        [parser.compile_filter(t) for t in tokens[3:]],
+    )
+
+
+class OwnerOnlyNode(template.Node):
+    def __init__(self, nodelist, user_id):
+        self.nodelist = nodelist
+        self.user_id = user_id
+
+    def render(self, context):
+        return owner_block(
+            self.user_id.resolve(context),
+            self.nodelist.render(context)
+        )
+
+
+@register.tag
+def owner_only(parser, token):
+    """Блок, который увидит только пользователь с указанным id:
+    {% owner_only post.author_id %}...{% endowner_only %}.
+    Разметка остается общей для всех, поэтому ее можно кешировать,
+    а подстановку делает yatube.esi.ESIMiddleware."""
+    nodelist = parser.parse(('endowner_only',))
+    parser.delete_first_token()
+    tokens = token.split_contents()
+    if len(tokens) != 2:
+        raise template.TemplateSyntaxError(
+            f"'{tokens[0]}' tag requires exactly one argument."
+        )
+    return OwnerOnlyNode(nodelist, parser.compile_filter(tokens[1]))
@@ -1,31 +1,52 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
 from django.contrib.auth import get_user_model
 from django.core.cache import cache
-from django.core.cache.utils import make_template_fragment_key
 from django.core.files.images import ImageFile
 from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.core.paginator import Paginator
+from django.db import IntegrityError, connection, transaction
 from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
 from django.shortcuts import reverse
+from django.utils import timezone
+
+from jobs.models import Job
 
-from posts.models import Post, Group, Follow, Comment
+from posts.cache import get_or_compute, index_page_key, post_item_key
+from posts.jobs import notify_comment, publish_due_posts
+from posts.live import SEQ_KEY, poll, publish
+from posts.notifications import notify, unread_count
+from posts.pagination import page_window
+from posts.markup import extract, render_text
+from posts.models import (
+    Post, PostRevision, Group, Follow, Comment, Tag, Notification
+)
 
 User = get_user_model()
 
 
 class PostsTest(TestCase):
-    def setUp(self):
-        cache.clear()
-        self.client = Client()
-        self.user = User.objects.create_user(
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
             username='test_user',
             email='test_user@test.ru',
             password='12345'
         )
-        self.group = Group.objects.create(
+        cls.group = Group.objects.create(
             title='testers',
             slug='testers',
             description='test_group'
         )
 
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+
     def test_profile(self):
         self.client.force_login(self.user)
         response = self.client.get(reverse(
@@ -130,30 +151,33 @@ class PostsTest(TestCase):
 
 
 class SprintSixTest(TestCase):
-    def setUp(self):
-        cache.clear()
-        self.client = Client()
-        self.user = User.objects.create_user(
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
             username='test_user',
             email='test_user@test.ru',
             password='12345'
         )
-        self.follower = User.objects.create_user(
+        cls.follower = User.objects.create_user(
             username='testfollower',
             email='testfollower@test.ru',
             password='testpass1'
         )
-        self.following = User.objects.create_user(
+        cls.following = User.objects.create_user(
             username='testfollowing',
             email='testfollowing@test.ru',
             password='testpass2'
         )
-        self.group = Group.objects.create(
+        cls.group = Group.objects.create(
             title='test',
             slug='test',
             description='test_group'
         )
-        
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+
     def test_image(self):
         self.client.force_login(self.user)
         small_gif= (
@@ -264,7 +288,7 @@ class SprintSixTest(TestCase):
         )
         second_response = self.client.get(reverse('index'))
         self.assertEqual(first_response.content, second_response.content)
-        key = make_template_fragment_key('index_page')
+        key = index_page_key()
         cache.delete(key)
         third_response = self.client.get(reverse('index'))
         self.assertNotEqual(second_response.content, third_response.content)
@@ -364,3 +388,633 @@ class SprintSixTest(TestCase):
         self.assertEqual(comment.text, 'Comment')
         self.assertEqual(comment.post, post)
         self.assertEqual(comment.author, self.user)
+
+
+class GetOrComputeTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.calls = 0
+
+    def compute(self):
+        self.calls += 1
+        return f'value {self.calls}'
+
+    def test_value_is_computed_once(self):
+        self.assertEqual(get_or_compute('key', self.compute, 20), 'value 1')
+        self.assertEqual(get_or_compute('key', self.compute, 20), 'value 1')
+        self.assertEqual(self.calls, 1)
+
+    def test_stale_value_is_served_while_other_worker_recomputes(self):
+        # Нулевой срок годности: значение сразу устаревшее, но хранится.
+        get_or_compute('key', self.compute, 0)
+        cache.add('key:lock', 1)
+        self.assertEqual(get_or_compute('key', self.compute, 20), 'value 1')
+        self.assertEqual(self.calls, 1)
+        cache.delete('key:lock')
+        self.assertEqual(get_or_compute('key', self.compute, 20), 'value 2')
+
+    def test_new_post_expires_index_fragment(self):
+        user = User.objects.create_user(username='writer', password='12345')
+        self.client.force_login(user)
+        self.client.get(reverse('index'))
+        self.client.post(reverse('new_post'), {'text': 'Свежий пост'})
+        response = self.client.get(reverse('index'))
+        self.assertContains(response, 'Свежий пост')
+
+    def test_index_fragment_varies_on_page(self):
+        user = User.objects.create_user(username='writer')
+        Post.objects.bulk_create(
+            Post(text=f'Пост номер {i}', author=user) for i in range(11)
+        )
+        first = self.client.get(reverse('index'))
+        second = self.client.get(reverse('index'), {'page': 2})
+        self.assertNotEqual(
+            [post.pk for post in first.context['page']],
+            [post.pk for post in second.context['page']],
+        )
+        self.assertEqual(second.content.count(b'card-body'), 1)
+
+
+class SharedFeedFragmentTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username='author')
+        self.reader = User.objects.create_user(username='reader')
+        self.post = Post.objects.create(text='Общий пост', author=self.author)
+        self.edit_url = reverse(
+            'post_edit', args=[self.author.username, self.post.id]
+        )
+
+    def test_edit_link_is_personalized_from_shared_fragment(self):
+        self.client.force_login(self.reader)
+        response = self.client.get(reverse('index'))
+        self.assertNotContains(response, self.edit_url)
+        self.assertNotContains(response, '<!--esi:')
+        fragment = cache.get(index_page_key())[0]
+        self.assertIn(self.edit_url, fragment)
+
+        self.client.force_login(self.author)
+        response = self.client.get(reverse('index'))
+        self.assertContains(response, self.edit_url)
+        self.assertEqual(cache.get(index_page_key())[0], fragment)
+
+    def test_edit_link_for_non_ascii_username(self):
+        author = User.objects.create_user(username='автор')
+        post = Post.objects.create(text='Пост автора', author=author)
+        edit_url = reverse('post_edit', args=['автор', post.id])
+        self.client.force_login(self.reader)
+        response = self.client.get(reverse('index'))
+        self.assertNotContains(response, edit_url)
+        self.assertNotContains(response, '<!--esi:')
+
+        self.client.force_login(author)
+        response = self.client.get(reverse('index'))
+        self.assertContains(response, edit_url)
+        self.assertNotContains(response, '<!--esi:')
+
+
+class LiveFeedTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username='author')
+        self.other = User.objects.create_user(username='other')
+
+    def test_burst_of_posts_is_coalesced_for_followers(self):
+        since, _, _ = poll(None)
+        for text in ('первый', 'второй'):
+            publish(Post.objects.create(text=text, author=self.author))
+        publish(Post.objects.create(text='чужой', author=self.other))
+        seq, ids, _ = poll(since)
+        self.assertEqual(len(ids), 3)
+        _, ids, overflow = poll(since, {self.author.id})
+        self.assertEqual(len(ids), 2)
+        self.assertFalse(overflow)
+        self.assertEqual(poll(seq), (seq, [], False))
+
+    def test_slow_client_gets_reset_instead_of_backlog(self):
+        for i in range(3):
+            publish(Post.objects.create(text=f'пост {i}', author=self.author))
+        with self.settings(LIVE_MAX_PENDING=2):
+            self.assertEqual(poll(0), (3, [], True))
+
+    def test_evicted_counter_is_seeded_again(self):
+        incr = cache.incr
+
+        def evicted_once(key, *args, **kwargs):
+            # Кеш вытеснил счетчик между чтением и incr.
+            patched.side_effect = incr
+            cache.delete(key)
+            raise ValueError(key)
+
+        with mock.patch.object(cache, 'incr', side_effect=evicted_once) \
+                as patched:
+            publish(Post.objects.create(text='новый', author=self.author))
+        self.assertEqual(cache.get(SEQ_KEY), 1)
+        self.assertEqual(len(poll(0)[1]), 1)
+
+    def test_live_feed_answers_without_holding_connection(self):
+        response = self.client.get(reverse('live_feed'))
+        self.assertFalse(response.streaming)
+        self.assertIn(b'id: 0\n', response.content)
+        publish(Post.objects.create(text='новый', author=self.author))
+        response = self.client.get(
+            reverse('live_feed'), HTTP_LAST_EVENT_ID='0'
+        )
+        self.assertIn(b'event: posts', response.content)
+
+    def test_live_feed_for_follow_requires_login(self):
+        response = self.client.get(reverse('live_feed'), {'feed': 'follow'})
+        self.assertEqual(response.status_code, 403)
+
+
+class ConditionalFeedTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username='author')
+        self.group = Group.objects.create(
+            title='Группа', slug='group', description='Описание'
+        )
+        self.post = Post.objects.create(
+            text='Старый текст', author=self.author, group=self.group
+        )
+        self.urls = (
+            reverse('index'),
+            reverse('group_posts', args=[self.group.slug]),
+            reverse('profile', args=[self.author.username]),
+        )
+
+    def revalidate(self, url, etag):
+        return self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+    def test_unchanged_feed_answers_304(self):
+        for url in self.urls:
+            with self.subTest(url=url):
+                etag = self.client.get(url)['ETag']
+                self.assertEqual(self.revalidate(url, etag).status_code, 304)
+
+    def test_edit_changes_validator(self):
+        etags = {url: self.client.get(url)['ETag'] for url in self.urls}
+        self.client.force_login(self.author)
+        self.client.post(
+            reverse('post_edit', args=[self.author.username, self.post.id]),
+            {'text': 'Новый текст', 'group': self.group.id}
+        )
+        self.client.logout()
+        for url in self.urls:
+            with self.subTest(url=url):
+                response = self.revalidate(url, etags[url])
+                self.assertContains(response, 'Новый текст')
+
+    def test_group_rename_refreshes_feeds(self):
+        etags = {url: self.client.get(url)['ETag'] for url in self.urls}
+        self.group.title = 'Новое название'
+        self.group.save()
+        for url in self.urls:
+            with self.subTest(url=url):
+                response = self.revalidate(url, etags[url])
+                self.assertContains(response, 'Новое название')
+
+    def test_validator_depends_on_user(self):
+        url = reverse('index')
+        etag = self.client.get(url)['ETag']
+        self.client.force_login(self.author)
+        self.assertEqual(self.revalidate(url, etag).status_code, 200)
+
+    def test_edit_refreshes_later_pages(self):
+        Post.objects.bulk_create(
+            Post(text=f'Новее {i}', author=self.author) for i in range(5)
+        )
+        url = reverse('profile', args=[self.author.username])
+        etag = self.client.get(url, {'page': 2})['ETag']
+        self.client.force_login(self.author)
+        self.client.post(
+            reverse('post_edit', args=[self.author.username, self.post.id]),
+            {'text': 'Новый текст'}
+        )
+        self.client.logout()
+        response = self.client.get(
+            url, {'page': 2}, HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertContains(response, 'Новый текст')
+
+    def test_missing_feed_is_not_revalidated(self):
+        group = Group.objects.create(
+            title='Пустая', slug='empty', description='Описание'
+        )
+        url = reverse('group_posts', args=[group.slug])
+        etag = self.client.get(url)['ETag']
+        group.delete()
+        response = self.revalidate(url, etag)
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(response.has_header('ETag'))
+
+
+class PostHistoryTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username='author')
+        self.post = Post.objects.create(text='Первая версия', author=self.author)
+        Comment.objects.create(
+            post=self.post, author=self.author, text='Комментарий'
+        )
+        self.client.force_login(self.author)
+
+    def test_edit_keeps_previous_version(self):
+        url = reverse('post_edit', args=[self.author.username, self.post.id])
+        self.client.post(url, {'text': 'Вторая версия'})
+        self.client.post(url, {'text': 'Вторая версия'})
+        revision = PostRevision.objects.get(post=self.post)
+        self.assertEqual(revision.text, 'Первая версия')
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.text, 'Вторая версия')
+
+    def test_deleted_post_leaves_feeds_but_keeps_comments(self):
+        self.client.post(reverse(
+            'post_delete', args=[self.author.username, self.post.id]
+        ))
+        self.assertFalse(Post.objects.exists())
+        self.assertEqual(Comment.objects.count(), 1)
+        for url in (
+            reverse('index'), 
+            reverse('profile', args=[self.author.username])
+        ):
+            with self.subTest(url=url):
+                self.assertNotContains(self.client.get(url), 'Первая версия')
+        response = self.client.get(
+            reverse('post', args=[self.author.username, self.post.id])
+        )
+        self.assertEqual(response.status_code, 404)
+
+    def test_purge_removes_old_deleted_posts(self):
+        fresh = Post.objects.create(text='Свежий', author=self.author)
+        fresh.soft_delete()
+        Post.objects.filter(pk=self.post.pk).update(
+            deleted_at=timezone.now() - timedelta(days=31)
+        )
+        call_command('purge_deleted_posts', batch_size=1, stdout=StringIO())
+        self.assertEqual(
+            list(Post.all_objects.values_list('pk', flat=True)), [fresh.pk]
+        )
+        self.assertFalse(Comment.objects.exists())
+
+
+class ScheduledPublishingTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username='author')
+        self.client.force_login(self.author)
+
+    def test_scheduled_post_goes_live_when_due(self):
+        publish_at = timezone.now() + timedelta(hours=1)
+        self.client.post(reverse('new_post'), {
+            'text': 'Отложенный пост',
+            'publish_at': publish_at.strftime('%Y-%m-%d %H:%M:%S'),
+        })
+        post = Post.all_objects.get()
+        self.assertFalse(post.published)
+        self.assertNotContains(self.client.get(reverse('index')), 'Отложенный')
+
+        publish_due_posts()
+        self.assertFalse(Post.objects.exists())
+
+        due = timezone.now() - timedelta(minutes=1)
+        Post.all_objects.update(publish_at=due)
+        publish_due_posts()
+        post = Post.objects.get()
+        self.assertEqual(post.pub_date, due)
+        self.assertContains(self.client.get(reverse('index')), 'Отложенный')
+
+    def test_author_sees_and_edits_scheduled_post(self):
+        post = Post.objects.create(
+            text='Отложенный пост', author=self.author, published=False,
+            publish_at=timezone.now() + timedelta(hours=1),
+        )
+        edit_url = reverse('post_edit', args=['author', post.pk])
+        self.assertContains(
+            self.client.get(reverse('profile', args=['author'])), edit_url
+        )
+        self.assertEqual(self.client.get(edit_url).status_code, 200)
+        self.client.post(edit_url, {'text': 'Исправленный пост'})
+        post.refresh_from_db()
+        self.assertEqual(post.text, 'Исправленный пост')
+
+        self.client.force_login(User.objects.create_user(username='other'))
+        response = self.client.get(reverse('post', args=['author', post.pk]))
+        self.assertEqual(response.status_code, 404)
+        self.assertNotContains(
+            self.client.get(reverse('profile', args=['author'])), edit_url
+        )
+
+    def test_next_publication_is_rescheduled(self):
+        publish_at = timezone.now() + timedelta(hours=1)
+        Post.objects.create(
+            text='Отложенный пост', author=self.author, published=False,
+            publish_at=publish_at,
+        )
+        with self.settings(JOBS_EAGER=False):
+            publish_due_posts()
+        job = Job.objects.get()
+        self.assertEqual(job.name, publish_due_posts.job_name)
+        self.assertAlmostEqual(
+            job.run_at.timestamp(), publish_at.timestamp(), delta=5
+        )
+
+
+class PageWindowTest(TestCase):
+    def window(self, number, count=100000):
+        paginator = Paginator(range(count), 10)
+        return page_window(paginator.page(number))
+
+    def test_window_size_does_not_depend_on_feed_size(self):
+        self.assertEqual(
+            self.window(5000), [1, None, 4998, 4999, 5000, 5001, 5002, None, 10000]
+        )
+        self.assertEqual(self.window(2), [1, 2, 3, 4, None, 10000])
+        self.assertEqual(self.window(10000), [1, None, 9998, 9999, 10000])
+        self.assertEqual(self.window(3, count=60), [1, 2, 3, 4, 5, 6])
+
+    def test_feed_count_is_capped(self):
+        author = User.objects.create_user(username='author')
+        Post.objects.bulk_create(
+            Post(text=str(i), author=author) for i in range(25)
+        )
+        with self.settings(FEED_MAX_PAGES=2):
+            response = self.client.get(reverse('index'), {'page': 5})
+        self.assertEqual(response.context['paginator'].num_pages, 2)
+        self.assertEqual(response.context['page'].number, 2)
+
+
+class FeedCountTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username='author')
+        Post.objects.bulk_create(
+            Post(text=str(i), author=self.author) for i in range(8)
+        )
+
+    def count(self):
+        return self.client.get(reverse('index')).context['paginator'].count
+
+    def test_small_feed_is_counted_exactly(self):
+        with self.settings(FEED_EXACT_COUNT=10):
+            self.assertEqual(self.count(), 8)
+            Post.objects.create(text='Еще один', author=self.author)
+            self.assertEqual(self.count(), 9)
+
+    def test_large_feed_count_is_cached(self):
+        with self.settings(FEED_EXACT_COUNT=5):
+            self.assertEqual(self.count(), 8)
+            Post.objects.create(text='Еще один', author=self.author)
+            with CaptureQueriesContext(connection) as queries:
+                self.assertEqual(self.count(), 8)
+        self.assertFalse(
+            [q for q in queries.captured_queries if 'COUNT' in q['sql']]
+        )
+
+    def test_cached_count_is_dropped_when_feed_shrinks(self):
+        self.client.force_login(self.author)
+        with self.settings(FEED_EXACT_COUNT=5):
+            self.assertEqual(self.count(), 8)
+            for post in Post.objects.all()[:4]:
+                self.client.post(reverse(
+                    'post_delete', args=['author', post.pk]
+                ))
+            self.assertEqual(self.count(), 4)
+
+
+class MarkupTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username='author')
+        self.friend = User.objects.create_user(username='friend.name')
+        self.client.force_login(self.author)
+
+    def test_extract_and_render(self):
+        text = 'Привет, @friend.name! #Django и #джанго, а не a#b или x@y.\n<b>'
+        self.assertEqual(extract(text), ({'django', 'джанго'}, {'friend.name'}))
+        html = render_text('#Django @friend.name @ghost\n<b>', {'friend.name'})
+        self.assertEqual(html, (
+            '<a href="/tag/django/">#Django</a> '
+            '<a href="/friend.name/">@friend.name</a> @ghost<br>&lt;b&gt;'
+        ))
+
+    def test_post_is_indexed_and_listed_in_tag_feed(self):
+        self.client.post(reverse('new_post'), {
+            'text': 'Пишу про #Django вместе с @friend.name'
+        })
+        post = Post.objects.get()
+        self.assertEqual(list(post.tags.values_list('name', flat=True)), ['django'])
+        self.assertEqual(list(post.mentions.all()), [self.friend])
+        self.assertIn('<a href="/tag/django/">#Django</a>', post.text_html)
+
+        response = self.client.get(reverse('tag_posts', args=['DJANGO']))
+        self.assertEqual(response.context['posts'], [post])
+        self.assertContains(response, 'href="/friend.name/"')
+
+        self.client.post(
+            reverse('post_edit', args=[self.author.username, post.id]),
+            {'text': 'Теперь про #python'}
+        )
+        self.assertEqual(
+            list(post.tags.values_list('name', flat=True)), ['python']
+        )
+        self.assertFalse(post.mentions.exists())
+        self.assertEqual(Tag.objects.count(), 2)
+
+    def test_comment_mentions(self):
+        post = Post.objects.create(text='Пост', author=self.author)
+        self.client.post(
+            reverse('add_comment', args=[self.author.username, post.id]),
+            {'text': '@friend.name посмотри'}
+        )
+        self.assertEqual(list(post.comments.get().mentions.all()), [self.friend])
+
+    def test_tag_feed_pages_by_cursor(self):
+        posts = [
+            Post.objects.create(text=f'#django {i}', author=self.author)
+            for i in range(12)
+        ]
+        url = reverse('tag_posts', args=['django'])
+        response = self.client.get(url)
+        self.assertEqual(response.context['posts'], posts[:1:-1])
+        self.assertContains(response, f'?before={posts[2].pk}')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, {'before': posts[2].pk})
+        self.assertEqual(response.context['posts'], posts[1::-1])
+        self.assertIsNone(response.context['next_cursor'])
+        self.assertFalse([
+            q for q in queries.captured_queries
+            if 'COUNT(*)' in q['sql'] or 'OFFSET' in q['sql']
+        ])
+
+    def test_save_outside_forms_renders_text(self):
+        post = Post.objects.create(text='Про #django', author=self.author)
+        post.text = 'Про #python для @friend.name'
+        post.save()
+        post.refresh_from_db()
+        self.assertIn('#python', post.text_html)
+        self.assertNotIn('#django', post.text_html)
+        self.assertEqual(list(post.mentions.all()), [self.friend])
+
+
+class RenderTextHtmlTest(TestCase):
+    def test_backfill_renders_old_rows(self):
+        author = User.objects.create_user(username='author')
+        post = Post.objects.create(text='Старый пост про #историю', author=author)
+        comment = Comment.objects.create(
+            post=post, author=author, text='<script>@author</script>'
+        )
+        # Строки, сохраненные до появления разметки.
+        Post.objects.update(text_html='')
+        Comment.objects.update(text_html='')
+        post.tags.clear()
+        comment.mentions.clear()
+        call_command('render_text_html', batch_size=1, stdout=StringIO())
+        post.refresh_from_db()
+        comment.refresh_from_db()
+        self.assertIn(reverse('tag_posts', args=['историю']), post.text_html)
+        self.assertEqual(list(post.tags.values_list('name', flat=True)), ['историю'])
+        self.assertEqual(
+            comment.text_html,
+            '&lt;script&gt;<a href="/author/">@author</a>&lt;/script&gt;'
+        )
+        response = self.client.get(reverse('post', args=['author', post.id]))
+        self.assertContains(response, comment.text_html, html=False)
+
+    def test_rerender_replaces_cached_items(self):
+        author = User.objects.create_user(username='author')
+        Post.objects.create(text='Пост про #историю', author=author)
+        # Разметка, отрендеренная по старым правилам.
+        Post.objects.update(text_html='Старая разметка')
+        cache.clear()
+        self.assertContains(self.client.get(reverse('index')), 'Старая разметка')
+        call_command('render_text_html', all=True, stdout=StringIO())
+        response = self.client.get(reverse('index'))
+        self.assertNotContains(response, 'Старая разметка')
+        self.assertContains(response, reverse('tag_posts', args=['историю']))
+
+
+class PostItemCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username='author')
+        self.posts = [
+            Post.objects.create(text=f'Пост {i}', author=self.author)
+            for i in range(3)
+        ]
+
+    def test_items_are_cached_and_invalidated_by_comments(self):
+        self.client.force_login(self.author)
+        self.client.get(reverse('profile', args=['author']))
+        for post in self.posts:
+            self.assertIsNotNone(cache.get(post_item_key(post, 0)))
+
+        Comment.objects.create(
+            post=self.posts[0], author=self.author, text='Комментарий'
+        )
+        response = self.client.get(
+            reverse('post', args=['author', self.posts[0].pk])
+        )
+        self.assertContains(response, '1 комментариев')
+        self.assertIsNotNone(cache.get(post_item_key(self.posts[0], 1)))
+
+    def test_edit_changes_key(self):
+        post = self.posts[0]
+        self.client.force_login(self.author)
+        self.client.get(reverse('profile', args=['author']))
+        # Старая версия, отрендеренная до коммита правки, остается
+        # под старым ключом и больше не читается.
+        old_key = post_item_key(post, 0)
+        self.client.post(
+            reverse('post_edit', args=['author', post.pk]),
+            {'text': 'Новый текст'}
+        )
+        post.refresh_from_db()
+        self.assertNotEqual(post_item_key(post, 0), old_key)
+        response = self.client.get(reverse('profile', args=['author']))
+        self.assertContains(response, 'Новый текст')
+
+
+class NotificationTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username='author')
+        self.reader = User.objects.create_user(username='reader')
+        self.post = Post.objects.create(text='Пост', author=self.author)
+        self.client.force_login(self.reader)
+
+    def test_comment_follow_and_mention(self):
+        self.client.post(
+            reverse('add_comment', args=['author', self.post.pk]),
+            {'text': 'Спасибо, @author'}
+        )
+        self.client.get(reverse('profile_follow', args=['author']))
+        verbs = set(
+            self.author.notifications.values_list('verb', 'actor__username')
+        )
+        self.assertEqual(verbs, {
+            (Notification.COMMENT, 'reader'),
+            (Notification.MENTION, 'reader'),
+            (Notification.FOLLOW, 'reader'),
+        })
+        self.assertEqual(unread_count(self.author), 3)
+
+    def test_unread_collapse_and_no_self_notification(self):
+        event = (self.author.pk, self.reader.pk, Notification.COMMENT,
+                 self.post.pk)
+        notify([event, event])
+        notify([event, (self.author.pk, self.author.pk,
+                        Notification.COMMENT, self.post.pk)])
+        notification = self.author.notifications.get()
+        self.assertEqual(notification.count, 3)
+        self.assertEqual(unread_count(self.author), 1)
+
+    def test_retried_job_is_not_counted_twice(self):
+        comment = Comment.objects.create(
+            post=self.post, author=self.reader, text='Комментарий'
+        )
+        notify_comment(comment.pk)
+        notify_comment(comment.pk)
+        self.assertEqual(self.author.notifications.get().count, 1)
+
+    def test_one_unread_row_per_event(self):
+        for post in (self.post, None):
+            with self.subTest(post=post):
+                fields = dict(
+                    recipient=self.author, actor=self.reader,
+                    verb=Notification.COMMENT, post=post,
+                )
+                Notification.objects.create(**fields)
+                with self.assertRaises(IntegrityError), transaction.atomic():
+                    Notification.objects.create(**fields)
+                Notification.objects.update(read=True)
+                Notification.objects.create(**fields)
+
+    def test_inbox_cursor_and_badge(self):
+        notify(
+            (self.reader.pk, self.author.pk, Notification.MENTION, post.pk)
+            for post in [
+                Post.objects.create(text=f'@reader {i}', author=self.author)
+                for i in range(25)
+            ]
+        )
+        response = self.client.get(reverse('index'))
+        self.assertContains(response, 'badge-danger">25<')
+
+        response = self.client.get(reverse('notifications'))
+        first = response.context['notifications']
+        self.assertEqual(len(first), 20)
+        self.assertEqual(unread_count(self.reader), 5)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(
+                reverse('notifications'),
+                {'before': response.context['next_cursor']}
+            )
+        self.assertEqual(len(response.context['notifications']), 5)
+        self.assertIsNone(response.context['next_cursor'])
+        self.assertFalse(
+            any('OFFSET' in query['sql'] for query in queries.captured_queries)
+        )
+        response = self.client.get(reverse('index'))
+        self.assertNotContains(response, 'badge-danger')
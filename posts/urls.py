@@ -7,6 +7,10 @@ urlpatterns = [
          views.group_posts, 
          name='group_posts'),
 
+    path('tag/<str:name>/', 
+         views.tag_posts, 
+         name='tag_posts'),
+
     path('new/', 
          views.new_post, 
          name='new_post'),
@@ -15,6 +19,14 @@ urlpatterns = [
           views.follow_index, 
           name="follow_index"),
 
+     path("notifications/", 
+          views.notifications, 
+          name="notifications"),
+
+     path("live/", 
+          views.live_feed, 
+          name="live_feed"),
+
     path('<str:username>/', 
          views.profile, 
          name='profile'),
@@ -35,6 +47,9 @@ urlpatterns = [
     path('<str:username>/<int:post_id>/edit/', 
          views.post_edit, 
          name='post_edit'),
+    path('<str:username>/<int:post_id>/delete/', 
+         views.post_delete, 
+         name='post_delete'),
 
 
     path('', 
@@ -1,84 +1,198 @@
+import hashlib
+
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.contrib.auth.decorators import login_required
-from django.core.cache import cache
-from django.core.cache.utils import make_template_fragment_key
-from django.core.paginator import Paginator
+from django.db import transaction
+from django.db.models import Max
+from django.http import HttpResponse, HttpResponseForbidden
 from django.shortcuts import get_object_or_404
 from django.shortcuts import redirect, render
+from django.views.decorators.http import condition, require_POST
+
+from jobs.queue import enqueue
 
-from .forms import PostForm, CommentForm
-from .models import Post, Group, Comment, Follow
+from .cache import bump_feed_generation, feed_generation
+from .forms import PostForm, CommentForm, ScheduleForm
+from .jobs import (
+    invalidate_post_feeds,
+    notify_comment,
+    notify_follow,
+    notify_post_mentions,
+    schedule_publication,
+)
+from .live import render_events
+from .models import Post, PostRevision, Group, Comment, Follow, Tag
+from .notifications import mark_read, unread_count
+from .pagination import cursor_page, paginate
 
 User = get_user_model()
 
 
+def enqueue_feed_invalidation(post):
+    enqueue(
+        invalidate_post_feeds,
+        post.pk,
+        dedup_key=f'invalidate-feeds:{post.pk}'
+    )
+
+
+def feed_etag(request, scope, posts, owner=None):
+    """Валидатор ленты без рендеринга и пагинации: последний pub_date
+    (индексный MAX), номер правки ленты, страница и пользователь, для
+    которого собрана шапка страницы."""
+    latest = posts.aggregate(latest=Max('pub_date'))['latest']
+    # Пустая лента несуществующей группы или автора — это 404 без ETag.
+    if latest is None and owner is not None and not owner.exists():
+        return None
+    state = ':'.join(map(str, (
+        scope,
+        feed_generation(scope),
+        latest,
+        request.GET.get('page'),
+        request.user.pk,
+        # Счетчик в шапке: новое уведомление должно менять страницу.
+        unread_count(request.user),
+    )))
+    return hashlib.sha1(state.encode()).hexdigest()
+
+
+def index_etag(request):
+    return feed_etag(request, 'index', Post.objects.all())
+
+
+def group_etag(request, slug):
+    return feed_etag(
+        request, 
+        f'group:{slug}', 
+        Post.objects.filter(group__slug=slug),
+        Group.objects.filter(slug=slug)
+    )
+
+
+def profile_etag(request, username):
+    return feed_etag(
+        request, 
+        f'profile:{username}', 
+        Post.objects.filter(author__username=username),
+        User.objects.filter(username=username)
+    )
+
+
+@condition(etag_func=index_etag)
 def index(request):
-    latest = Post.objects.all()
-    paginator = Paginator(latest, 10)
-    page_number = request.GET.get('page')
-    page = paginator.get_page(page_number)
+    latest = Post.objects.select_related('author', 'group')
+    paginator, page = paginate(request, latest, 10, 'index')
     return render(request, "index.html", {
         'page':page, 
-        'paginator':paginator
+        'paginator':paginator,
+        'generation': feed_generation('index'),
     })
  
 
+@condition(etag_func=group_etag)
 def group_posts(request, slug):
     group = get_object_or_404(Group, slug=slug)
-    posts = group.posts.all()
-    paginator = Paginator(posts, 10) 
-    page_number = request.GET.get('page') 
-    page = paginator.get_page(page_number)
+    posts = group.posts.select_related('author', 'group')
+    paginator, page = paginate(request, posts, 10, f'group:{slug}')
     return render(request, "group.html", {
         'page': page,
         'group': group, 
-        'paginator': paginator
+        'paginator': paginator,
+        'generation': feed_generation(f'group:{slug}'),
+    })
+
+
+def author_posts(request, username):
+    """Посты для страниц автора: сам автор видит и правит еще и свои
+    запланированные."""
+    if (
+        request.user.is_authenticated
+        and request.user.get_username() == username
+    ):
+        return Post.all_objects.filter(deleted_at__isnull=True)
+    return Post.objects.all()
+
+
+def tag_posts(request, name):
+    tag = get_object_or_404(Tag, name=name.lower())
+    # Глубокие страницы тега не стоят ни COUNT, ни OFFSET.
+    posts, next_cursor = cursor_page(
+        tag.posts.select_related('author', 'group'),
+        request.GET.get('before'),
+        10
+    )
+    return render(request, 'tag.html', {
+        'tag': tag,
+        'posts': posts,
+        'next_cursor': next_cursor,
     })
 
 
 @login_required
 def new_post(request):
     form = PostForm(request.POST or None, files=request.FILES or None)
-    if not form.is_valid():
+    schedule_form = ScheduleForm(request.POST or None)
+    if not (form.is_valid() and schedule_form.is_valid()):
         return render(request, 'new_post.html', {
-            'form':form
+            'form':form,
+            'schedule_form': schedule_form,
         })
     new_post = form.save(commit=False)
     new_post.author = request.user
+    new_post.publish_at = schedule_form.cleaned_data['publish_at']
+    new_post.published = new_post.publish_at is None
     new_post.save()
-    key = make_template_fragment_key('index_page')
-    cache.delete(key)
+    if new_post.published:
+        enqueue_feed_invalidation(new_post)
+        enqueue(notify_post_mentions, new_post.pk)
+    else:
+        schedule_publication(new_post.publish_at)
+        # Запланированные посты автор видит в своем профиле.
+        bump_feed_generation(f'profile:{request.user.username}')
     return redirect('index')
 
 
+@condition(etag_func=profile_etag)
 def profile(request, username):
     author = get_object_or_404(User, username=username)
-    posts_profile = author.posts.all()
+    posts_profile = author.posts.select_related('author', 'group')
     following = (
         request.user.is_authenticated
         and author.following.filter(user=request.user).exists()
     )
-    paginator = Paginator(posts_profile, 5)
+    scheduled = None
+    if request.user == author:
+        scheduled = author_posts(request, username).filter(
+            author=author, published=False
+        ).order_by('publish_at')
     page_number = request.GET.get('page')
-    page = paginator.get_page(page_number)
+    paginator, page = paginate(
+        request, 
+        posts_profile, 
+        5, 
+        f'profile:{username}'
+    )
     return render(request, 'profile.html', {
         'profile':author, 
         'paginator': paginator, 
         'page_num': page_number, 
         'page':page,
         'following': following,
+        'scheduled': scheduled,
+        'generation': feed_generation(f'profile:{username}'),
     })
  
  
 def post_view(request, username, post_id):
     profile = get_object_or_404(User, username=username)
-    post = get_object_or_404(Post,  pk=post_id)
+    post = get_object_or_404(author_posts(request, username), pk=post_id)
     following = (
         request.user.is_authenticated
         and profile.following.filter(user=request.user).exists()
     )
     form = CommentForm()
-    comments = post.comments.all()
+    comments = post.comments.select_related('author')
     author = post.author
     return render(request, 'post.html', {
         'profile': profile,
@@ -92,9 +206,20 @@ def post_view(request, username, post_id):
 @login_required
 def post_edit(request, username, post_id):
     author = get_object_or_404(User, username=username)
-    post = get_object_or_404(Post, author__username=username, pk=post_id)
+    post = get_object_or_404(
+        author_posts(request, username), 
+        author__username=username, 
+        pk=post_id
+    )
     if request.user != author:
         return redirect('post', username=username, post_id=post_id)
+    # Форма меняет instance при валидации, поэтому старую версию
+    # запоминаем заранее.
+    revision = PostRevision(
+        post=post, 
+        text=post.text, 
+        image=post.image.name or ''
+    )
     form = PostForm(
         request.POST or None, 
         files=request.FILES or None, 
@@ -105,10 +230,29 @@ def post_edit(request, username, post_id):
             'form': form, 
             'post': post
         })
-    form.save()
+    if form.has_changed():
+        with transaction.atomic():
+            revision.save()
+            form.save()
+        enqueue_feed_invalidation(post)
     return redirect('post', username=username, post_id=post_id)
 
 
+@login_required
+@require_POST
+def post_delete(request, username, post_id):
+    post = get_object_or_404(
+        author_posts(request, username), 
+        author__username=username, 
+        pk=post_id
+    )
+    if request.user != post.author:
+        return redirect('post', username=username, post_id=post_id)
+    post.soft_delete()
+    enqueue_feed_invalidation(post)
+    return redirect('profile', username=username)
+
+
 @login_required
 def add_comment(request, username, post_id):
     post = get_object_or_404(Post, author__username=username, pk=post_id)
@@ -119,21 +263,68 @@ def add_comment(request, username, post_id):
     comment.author = request.user
     comment.post = post
     comment.save()
+    enqueue_feed_invalidation(post)
+    enqueue(notify_comment, comment.pk)
     return redirect('post', username=post.author, post_id=post_id)
 
 
 @login_required
 def follow_index(request):
-    post_list = Post.objects.filter(author__following__user=request.user).all()
-    paginator = Paginator(post_list, 10)
-    page_number = request.GET.get("page")
-    page = paginator.get_page(page_number)
+    post_list = Post.objects.filter(
+        author__following__user=request.user
+    ).select_related('author', 'group')
+    paginator, page = paginate(
+        request, 
+        post_list, 
+        10, 
+        f'follow:{request.user.pk}'
+    )
     return render(request, "follow.html", {
         "page": page, 
         "paginator": paginator
     })
 
 
+@login_required
+def notifications(request):
+    items, next_cursor = cursor_page(
+        request.user.notifications.select_related('actor', 'post__author'),
+        request.GET.get('before'),
+        settings.NOTIFICATIONS_PER_PAGE
+    )
+    # Непрочитанные на этой странице подсвечиваются один раз.
+    mark_read(request.user, [item.pk for item in items if not item.read])
+    return render(request, 'notifications.html', {
+        'notifications': items,
+        'next_cursor': next_cursor,
+    })
+
+
+def live_feed(request):
+    authors = None
+    if request.GET.get('feed') == 'follow':
+        if not request.user.is_authenticated:
+            return HttpResponseForbidden()
+        authors = set(request.user.follower.values_list(
+            'author_id', 
+            flat=True
+        ))
+    # EventSource присылает id последнего полученного сообщения сам.
+    since = request.META.get('HTTP_LAST_EVENT_ID', '')
+    response = HttpResponse(
+        render_events(int(since) if since.isdigit() else None, authors),
+        content_type='text/event-stream'
+    )
+    response['Cache-Control'] = 'no-cache'
+    return response
+
+
+def bump_follow_generations(user, author):
+    # Счетчики подписок видны на страницах обоих профилей.
+    bump_feed_generation(f'profile:{user.username}')
+    bump_feed_generation(f'profile:{author.username}')
+
+
 @login_required
 def profile_follow(request, username):
     if request.user.username == username:
@@ -144,7 +335,9 @@ def profile_follow(request, username):
         author=following
     ).exists()
     if not already_follows:
-        Follow.objects.create(user=request.user, author=following)
+        follow = Follow.objects.create(user=request.user, author=following)
+        bump_follow_generations(request.user, following)
+        enqueue(notify_follow, follow.pk)
     return redirect("profile", username=username)
     
 
@@ -153,6 +346,7 @@ def profile_unfollow(request, username):
     following = get_object_or_404(User, username=username)
     follower = get_object_or_404(Follow, author=following, user=request.user)
     follower.delete()
+    bump_follow_generations(request.user, following)
     return redirect("profile", username=username)
 
 
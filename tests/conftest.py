@@ -1,4 +1,14 @@
+import pytest
+
 pytest_plugins = [
     'tests.fixtures.fixture_user',
     'tests.fixtures.fixture_data',
 ]
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    # После отката транзакции id постов повторяются, и закешированные
+    # фрагменты лент не должны переходить из теста в тест.
+    from django.core.cache import cache
+    cache.clear()
@@ -1,9 +1,18 @@
 import pytest
 
 
+@pytest.fixture(scope='session')
+def django_db_setup(django_db_setup, django_db_blocker):
+    # Пользователь создается один раз на всю сессию: каждый тест
+    # откатывает свою транзакцию, а эта запись остается.
+    from django.contrib.auth import get_user_model
+    with django_db_blocker.unblock():
+        get_user_model().objects.create_user(username='TestUser', password='1234567')
+
+
 @pytest.fixture
 def user(django_user_model):
-    return django_user_model.objects.create_user(username='TestUser', password='1234567')
+    return django_user_model.objects.get(username='TestUser')
 
 
 @pytest.fixture
@@ -59,7 +59,7 @@ class TestComment:
         assert post_field.related_model == Post, \
             'Свойство `group` модели `Comment` должно быть ссылкой на модель `Post`'
 
-    @pytest.mark.django_db(transaction=True)
+    @pytest.mark.django_db
     def test_comment_add_view(self, client, post):
         try:
             response = client.get(f'/{post.author.username}/{post.id}/comment')
@@ -76,7 +76,7 @@ class TestComment:
         if not(response.status_code in (301, 302) and response.url.startswith(f'/auth/login')):
             assert False, 'Проверьте, что не авторизованного пользователя `/<username>/<post_id>/comment/` отправляете на страницу авторизации'
 
-    @pytest.mark.django_db(transaction=True)
+    @pytest.mark.django_db
     def test_comment_add_auth_view(self, user_client, post):
         try:
             response = user_client.get(f'/{post.author.username}/{post.id}/comment')
@@ -69,7 +69,7 @@ class TestFollow:
         assert response.status_code != 404, f'Страница `{str_url}` не найдена, проверьте этот адрес в *urls.py*'
         return response
 
-    @pytest.mark.django_db(transaction=True)
+    @pytest.mark.django_db
     def test_follow_not_auth(self, client, user):
         response = self.check_url(client, '/follow', '/follow/')
         if not(response.status_code in (301, 302) and response.url.startswith(f'/auth/login')):
@@ -86,7 +86,7 @@ class TestFollow:
             assert False, 'Проверьте, что не авторизованного пользователя `/<username>/unfollow/` ' \
                           'отправляете на страницу авторизации'
 
-    @pytest.mark.django_db(transaction=True)
+    @pytest.mark.django_db
     def test_follow_auth(self, user_client, user, post):
         assert user.follower.count() == 0, 'Проверьте, что правильно считается подписки'
         self.check_url(user_client, f'/{post.author.username}/follow', '/<username>/follow/')
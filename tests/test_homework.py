@@ -72,7 +72,7 @@ class TestPost:
         assert image_field.upload_to == 'posts/', \
             "Свойство `image` модели `Post` должно быть с атрибутом `upload_to='posts/'`"
 
-    @pytest.mark.django_db(transaction=True)
+    @pytest.mark.django_db
     def test_post_create(self, user):
         text = 'Тестовый пост'
         author = user
@@ -131,7 +131,7 @@ class TestGroup:
         assert type(description_field) == fields.TextField, \
             'Свойство `description` модели `Group` должно быть текстовым `TextField`'
 
-    @pytest.mark.django_db(transaction=True)
+    @pytest.mark.django_db
     def test_group_create(self, user):
         text = 'Тестовый пост'
         author = user
@@ -158,7 +158,7 @@ class TestGroup:
 
 class TestGroupView:
 
-    @pytest.mark.django_db(transaction=True)
+    @pytest.mark.django_db
     def test_group_view(self, client, post_with_group):
         try:
             response = client.get(f'/group/{post_with_group.group.slug}')
@@ -9,7 +9,7 @@ from posts.models import Post
 
 class TestNewView:
 
-    @pytest.mark.django_db(transaction=True)
+    @pytest.mark.django_db
     def test_new_view_get(self, user_client):
         try:
             response = user_client.get('/new')
@@ -47,7 +47,7 @@ class TestNewView:
         file_obj.seek(0)
         return File(file_obj, name=name)
 
-    @pytest.mark.django_db(transaction=True)
+    @pytest.mark.django_db
     def test_new_view_post(self, user_client, user, group):
         text = 'Проверка нового поста!'
         try:
@@ -5,7 +5,7 @@ from django.core.paginator import Paginator, Page
 
 class TestGroupPaginatorView:
 
-    @pytest.mark.django_db(transaction=True)
+    @pytest.mark.django_db
     def test_group_paginator_view_get(self, client, post_with_group):
         try:
             response = client.get(f'/group/{post_with_group.group.slug}')
@@ -24,7 +24,7 @@ class TestGroupPaginatorView:
         assert type(response.context['page']) == Page, \
             'Проверьте, что переменная `page` на странице `/group/<slug>/` типа `Page`'
 
-    @pytest.mark.django_db(transaction=True)
+    @pytest.mark.django_db
     def test_index_paginator_view_get(self, client, post_with_group):
         response = client.get(f'/')
         assert response.status_code != 404, 'Страница `/` не найдена, проверьте этот адрес в *urls.py*'
@@ -17,7 +17,7 @@ def get_field_context(context, field_type):
 
 class TestPostView:
 
-    @pytest.mark.django_db(transaction=True)
+    @pytest.mark.django_db
     def test_post_view_get(self, client, post_with_group):
         try:
             response = client.get(f'/{post_with_group.author.username}/{post_with_group.id}')
@@ -58,7 +58,7 @@ class TestPostView:
 
 class TestPostEditView:
 
-    @pytest.mark.django_db(transaction=True)
+    @pytest.mark.django_db
     def test_post_edit_view_get(self, client, post_with_group):
         try:
             response = client.get(f'/{post_with_group.author.username}/{post_with_group.id}/edit')
@@ -72,7 +72,7 @@ class TestPostEditView:
         assert response.status_code in (301, 302), \
             'Проверьте, что вы переадресуете пользователя со страницы `/<username>/<post_id>/edit/` на страницу поста, если он не автор'
 
-    @pytest.mark.django_db(transaction=True)
+    @pytest.mark.django_db
     def test_post_edit_view_author_get(self, user_client, post_with_group):
         try:
             response = user_client.get(f'/{post_with_group.author.username}/{post_with_group.id}/edit')
@@ -118,7 +118,7 @@ class TestPostEditView:
         file_obj.seek(0)
         return File(file_obj, name=name)
 
-    @pytest.mark.django_db(transaction=True)
+    @pytest.mark.django_db
     def test_post_edit_view_author_post(self, user_client, post_with_group):
         text = 'Проверка изменения поста!'
         try:
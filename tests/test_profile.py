@@ -13,7 +13,7 @@ def get_field_context(context, field_type):
 
 class TestProfileView:
 
-    @pytest.mark.django_db(transaction=True)
+    @pytest.mark.django_db
     def test_profile_view_get(self, client, post_with_group):
         try:
             response = client.get(f'/{post_with_group.author.username}')
@@ -0,0 +1,54 @@
+from django.conf import settings
+from django.contrib.auth import (
+    BACKEND_SESSION_KEY,
+    HASH_SESSION_KEY,
+    _get_user_session_key,
+    load_backend,
+)
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import caches
+from django.utils.crypto import constant_time_compare
+
+
+def user_cache_key(user_id):
+    return f'auth:user:{user_id}'
+
+
+def invalidate_user(user_id):
+    caches[settings.USER_CACHE_ALIAS].delete(user_cache_key(user_id))
+
+
+def _session_hash_verified(request, user):
+    if not hasattr(user, 'get_session_auth_hash'):
+        return True
+    session_hash = request.session.get(HASH_SESSION_KEY)
+    return session_hash and constant_time_compare(
+        session_hash,
+        user.get_session_auth_hash()
+    )
+
+
+def get_cached_user(request):
+    """Аналог django.contrib.auth.get_user, который берет пользователя
+    из кеша по id вместо запроса к базе на каждый запрос."""
+    try:
+        user_id = _get_user_session_key(request)
+        backend_path = request.session[BACKEND_SESSION_KEY]
+    except KeyError:
+        return AnonymousUser()
+    if backend_path not in settings.AUTHENTICATION_BACKENDS:
+        return AnonymousUser()
+
+    cache = caches[settings.USER_CACHE_ALIAS]
+    key = user_cache_key(user_id)
+    user = cache.get(key)
+    if user is None or not _session_hash_verified(request, user):
+        # Закешированная копия могла устареть (например, сменился пароль
+        # в другом процессе), поэтому перед сбросом сессии сверяемся с базой.
+        user = load_backend(backend_path).get_user(user_id)
+        if user is not None:
+            cache.set(key, user, settings.USER_CACHE_TIMEOUT)
+    if user is None or not _session_hash_verified(request, user):
+        request.session.flush()
+        return AnonymousUser()
+    return user
@@ -0,0 +1,68 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+
+from posts.models import Follow, Post
+from yatube.benchmarks import bench_database, format_stats, measure
+
+User = get_user_model()
+
+SESSION_ENGINES = ('db', 'cached_db', 'signed_cookies')
+AUTH_MIDDLEWARES = {
+    'stock': 'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'cached': 'users.middleware.CachedAuthenticationMiddleware',
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает накладные расходы на запрос для разных движков сессий '
+        'и middleware аутентификации на ленте авторизованного пользователя.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200)
+        parser.add_argument('--posts', type=int, default=50)
+
+    def handle(self, *args, **options):
+        with bench_database():
+            reader = self.seed(options['posts'])
+            for engine in SESSION_ENGINES:
+                for name, middleware in AUTH_MIDDLEWARES.items():
+                    self.run_case(reader, engine, name, middleware, options)
+
+    def seed(self, posts):
+        author = User.objects.create_user('bench_author', password='bench')
+        reader = User.objects.create_user('bench_reader', password='bench')
+        Follow.objects.create(user=reader, author=author)
+        Post.objects.bulk_create(
+            Post(text=f'Пост {i}', author=author) for i in range(posts)
+        )
+        return reader
+
+    def run_case(self, reader, engine, name, middleware, options):
+        stack = [
+            middleware if item in AUTH_MIDDLEWARES.values() else item
+            for item in settings.MIDDLEWARE
+        ]
+        with override_settings(
+            SESSION_ENGINE=f'django.contrib.sessions.backends.{engine}',
+            MIDDLEWARE=stack,
+        ):
+            client = Client()
+            client.force_login(reader)
+            url = reverse('follow_index')
+            client.get(url)
+            with CaptureQueriesContext(connection) as queries:
+                client.get(url)
+            query_count = len(queries)
+            stats = measure(lambda: client.get(url), options['requests'])
+        self.stdout.write(format_stats(
+            f'{engine} + {name} auth',
+            stats,
+            f'  queries {query_count}'
+        ))
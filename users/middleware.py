@@ -0,0 +1,19 @@
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.utils.functional import SimpleLazyObject
+
+from .cache import get_cached_user
+
+
+def get_user(request):
+    if not hasattr(request, '_cached_user'):
+        request._cached_user = get_cached_user(request)
+    return request._cached_user
+
+
+class CachedAuthenticationMiddleware(AuthenticationMiddleware):
+    def process_request(self, request):
+        assert hasattr(request, 'session'), (
+            "The cached authentication middleware requires session "
+            "middleware to be installed."
+        )
+        request.user = SimpleLazyObject(lambda: get_user(request))
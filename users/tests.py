@@ -1,3 +1,46 @@
-from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.shortcuts import reverse
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
 
-# Create your tests here.
+from .cache import user_cache_key
+
+User = get_user_model()
+
+
+class CachedUserTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.user = User.objects.create_user(
+            username='test_user',
+            password='12345'
+        )
+
+    def test_user_is_cached_after_first_request(self):
+        self.client.force_login(self.user)
+        self.client.get(reverse('index'))
+        self.assertEqual(cache.get(user_cache_key(self.user.pk)), self.user)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('new_post'))
+        self.assertEqual(response.context['user'], self.user)
+        self.assertFalse(
+            [q for q in queries.captured_queries if 'auth_user' in q['sql']]
+        )
+
+    def test_user_save_drops_cache(self):
+        self.client.force_login(self.user)
+        self.client.get(reverse('index'))
+        self.user.first_name = 'Новое имя'
+        self.user.save()
+        self.assertIsNone(cache.get(user_cache_key(self.user.pk)))
+
+    def test_password_change_logs_out(self):
+        self.client.force_login(self.user)
+        self.client.get(reverse('index'))
+        self.user.set_password('новый-пароль')
+        self.user.save()
+        response = self.client.get(reverse('new_post'))
+        self.assertEqual(response.status_code, 302)
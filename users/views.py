@@ -4,10 +4,18 @@ from django.views.generic import CreateView
 
 from django.urls import reverse_lazy
 
+from jobs.queue import enqueue
+
 from .forms import CreationForm
+from .jobs import send_welcome_email
 
 
 class SignUp(CreateView):
     form_class = CreationForm
     success_url = reverse_lazy("login") #  где login — это параметр "name" в path()
     template_name = "signup.html"
+
+    def form_valid(self, form):
+        response = super().form_valid(form)
+        enqueue(send_welcome_email, self.object.pk)
+        return response
@@ -0,0 +1,39 @@
+import statistics
+import time
+from contextlib import contextmanager
+
+from django.db import connection
+
+
+@contextmanager
+def bench_database():
+    """Создает временную тестовую базу, чтобы замеры не трогали рабочую."""
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+def measure(func, repeat, warmup=5):
+    for _ in range(warmup):
+        func()
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    return {
+        'mean': statistics.mean(timings),
+        'p50': timings[len(timings) // 2],
+        'p95': timings[int(len(timings) * 0.95) - 1],
+    }
+
+
+def format_stats(label, stats, extra=''):
+    return (
+        f"{label:<40} mean {stats['mean']:8.3f} ms"
+        f"  p50 {stats['p50']:8.3f} ms  p95 {stats['p95']:8.3f} ms{extra}"
+    )
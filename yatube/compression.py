@@ -0,0 +1,96 @@
+"""Response compression with a cache of already compressed bodies.
+
+Rendered HTML and JSON are compressed with brotli (when the package is
+installed) or gzip, chosen from Accept-Encoding. Compressed bodies are
+kept in a per-process cache under a hash of the raw body, so a hot page
+that many clients receive byte-for-byte identical (cached feeds for
+anonymous users) is compressed once instead of on every request. Pages
+for logged-in users and responses that set cookies are never identical
+across clients, so they are compressed without touching the cache.
+"""
+import gzip
+import hashlib
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.cache import patch_vary_headers
+
+from .encoding import negotiate as negotiate_encoding
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_TYPES = ('text/html', 'application/json')
+MIN_LENGTH = 200
+# При равных q предпочитаем br: он сжимает HTML лучше gzip.
+SUPPORTED = ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def _compress(encoding, content):
+    if encoding == 'br':
+        return brotli.compress(content, quality=5)
+    return gzip.compress(content, compresslevel=6)
+
+
+def negotiate(header):
+    return negotiate_encoding(header, SUPPORTED)
+
+
+def compressed_body(encoding, content):
+    if len(content) > settings.COMPRESSION_CACHE_MAX_SIZE:
+        return _compress(encoding, content)
+    cache = caches[settings.COMPRESSION_CACHE_ALIAS]
+    key = f'compressed:{encoding}:{hashlib.sha1(content).hexdigest()}'
+    body = cache.get(key)
+    if body is None:
+        body = _compress(encoding, content)
+        cache.set(key, body, settings.COMPRESSION_CACHE_TIMEOUT)
+    return body
+
+
+def is_shared(request, response):
+    user = getattr(request, 'user', None)
+    return (
+        not (user is not None and user.is_authenticated)
+        and not response.cookies
+        and 'private' not in response.get('Cache-Control', '')
+    )
+
+
+class CompressionMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        # Потоковые ответы (медиа, SSE) и уже сжатое не трогаем.
+        if (
+            response.streaming
+            or response.has_header('Content-Encoding')
+            or not response.get('Content-Type', '').startswith(
+                COMPRESSIBLE_TYPES
+            )
+            or len(response.content) < MIN_LENGTH
+        ):
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = negotiate(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if encoding is None:
+            return response
+        if is_shared(request, response):
+            body = compressed_body(encoding, response.content)
+        else:
+            body = _compress(encoding, response.content)
+        if len(body) >= len(response.content):
+            return response
+
+        response.content = body
+        response['Content-Length'] = str(len(body))
+        response['Content-Encoding'] = encoding
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        return response
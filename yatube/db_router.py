@@ -0,0 +1,66 @@
+"""Read replicas for feed pages.
+
+ReplicaMiddleware marks GET/HEAD requests to the views named in
+REPLICA_VIEWS. While a request is marked, ReplicaRouter sends its reads
+to a random database from REPLICA_DATABASES. Everything else, including
+every write, goes to ``default``.
+
+Read-your-writes: the first write in a request switches the rest of the
+request to the primary. The response then sets a short-lived cookie,
+and requests carrying it read from the primary for REPLICA_PIN_SECONDS,
+which is meant to outlast replication lag.
+"""
+import random
+import threading
+
+from django.conf import settings
+
+_state = threading.local()
+
+
+def reading_from_replica():
+    return getattr(_state, 'replica', False)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if reading_from_replica() and settings.REPLICA_DATABASES:
+            return random.choice(settings.REPLICA_DATABASES)
+        return None
+
+    def db_for_write(self, model, **hints):
+        _state.replica = False
+        _state.wrote = True
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Реплики — копии основной базы.
+        return True
+
+
+class ReplicaMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        _state.replica = False
+        _state.wrote = False
+        try:
+            response = self.get_response(request)
+        finally:
+            _state.replica = False
+        if _state.wrote:
+            response.set_cookie(
+                settings.REPLICA_PIN_COOKIE,
+                '1',
+                max_age=settings.REPLICA_PIN_SECONDS,
+                httponly=True,
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        _state.replica = (
+            request.method in ('GET', 'HEAD')
+            and request.resolver_match.url_name in settings.REPLICA_VIEWS
+            and settings.REPLICA_PIN_COOKIE not in request.COOKIES
+        )
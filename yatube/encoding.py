@@ -0,0 +1,26 @@
+"""Content-coding negotiation from Accept-Encoding, with q-values."""
+import re
+
+ACCEPT_ENCODING_RE = re.compile(r'\s*([\w*]+)\s*(?:;\s*q=([0-9.]+))?\s*')
+
+
+def accepted_encodings(header):
+    accepted = {}
+    for item in header.split(','):
+        match = ACCEPT_ENCODING_RE.fullmatch(item)
+        if match:
+            accepted[match.group(1).lower()] = float(match.group(2) or 1)
+    return accepted
+
+
+def negotiate(header, supported):
+    """Лучшая по q кодировка из supported или None, если клиент не
+    принимает ни одну. Среди равных по q побеждает первая в supported."""
+    accepted = accepted_encodings(header)
+    candidates = [
+        encoding for encoding in supported
+        if accepted.get(encoding, accepted.get('*', 0)) > 0
+    ]
+    if not candidates:
+        return None
+    return max(candidates, key=lambda e: accepted.get(e, 0))
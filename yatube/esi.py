@@ -0,0 +1,45 @@
+"""Edge-side-include style personalisation of shared HTML.
+
+Cached fragments are rendered once for everybody; parts that only the
+owner of an object may see are wrapped by {% owner_only %} into
+``<!--esi:owner USER_ID-->...<!--/esi:owner-->`` markers. The middleware
+resolves the markers for the current user just before the response
+leaves, so the fragment cache never stores per-user HTML. The marker
+carries the user's id rather than the username, which may be non-ASCII.
+"""
+import re
+
+OWNER_BLOCK = re.compile(
+    rb'<!--esi:owner (\d+)-->(.*?)<!--/esi:owner-->', re.DOTALL
+)
+
+
+def owner_block(user_id, content):
+    return f'<!--esi:owner {int(user_id)}-->{content}<!--/esi:owner-->'
+
+
+def resolve_owner_blocks(content, user_id):
+    user_id = str(user_id).encode() if user_id is not None else None
+
+    def replace(match):
+        return match.group(2) if match.group(1) == user_id else b''
+
+    return OWNER_BLOCK.sub(replace, content)
+
+
+class ESIMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if (
+            response.streaming
+            or not response.get('Content-Type', '').startswith('text/html')
+            or b'<!--esi:' not in response.content
+        ):
+            return response
+        user = getattr(request, 'user', None)
+        user_id = user.pk if user and user.is_authenticated else None
+        response.content = resolve_owner_blocks(response.content, user_id)
+        return response
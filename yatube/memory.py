@@ -0,0 +1,121 @@
+"""Memory instrumentation for long-running workers.
+
+MemoryMiddleware logs how much the worker's RSS and peak RSS grew during
+each request. When MEMORY_TRACEMALLOC_FRAMES is set, it also takes a
+tracemalloc snapshot every MEMORY_SNAPSHOT_INTERVAL seconds and logs the
+allocation sites that grew most since the previous snapshot.
+
+If RSS goes over MEMORY_MAX_RSS megabytes, the worker signals itself
+with MEMORY_RECYCLE_SIGNAL once the current response is finished. Under
+gunicorn or uWSGI, SIGTERM makes the master replace the worker
+gracefully.
+
+RSS belongs to the whole process, so in threaded workers a request's
+delta also includes allocations made by concurrent requests.
+"""
+import logging
+import os
+import resource
+import signal
+import sys
+import threading
+import time
+import tracemalloc
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.signals import request_finished
+
+logger = logging.getLogger(__name__)
+
+PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+
+def rss_bytes():
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * PAGE_SIZE
+    except OSError:
+        return peak_rss_bytes()
+
+
+def peak_rss_bytes():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux отдает килобайты, macOS — байты.
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def recycle():
+    logger.warning(
+        'Worker %s uses %d MB, recycling', os.getpid(), rss_bytes() >> 20
+    )
+    os.kill(os.getpid(), getattr(signal, settings.MEMORY_RECYCLE_SIGNAL))
+
+
+class MemoryMiddleware:
+    def __init__(self, get_response):
+        if not settings.MEMORY_MONITOR:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.lock = threading.Lock()
+        self.snapshot = None
+        self.snapshot_at = time.monotonic()
+        self.recycling = False
+        if settings.MEMORY_TRACEMALLOC_FRAMES and not tracemalloc.is_tracing():
+            tracemalloc.start(settings.MEMORY_TRACEMALLOC_FRAMES)
+            self.snapshot = self.take_snapshot()
+
+    def __call__(self, request):
+        rss, peak = rss_bytes(), peak_rss_bytes()
+        response = self.get_response(request)
+        rss_delta = rss_bytes() - rss
+        peak_delta = peak_rss_bytes() - peak
+        level = (
+            logging.INFO
+            if max(rss_delta, peak_delta) >= settings.MEMORY_LOG_DELTA << 10
+            else logging.DEBUG
+        )
+        logger.log(
+            level, '%s %s: rss %+d KB, peak %+d KB',
+            request.method, request.path, rss_delta >> 10, peak_delta >> 10,
+            extra={'rss_delta': rss_delta, 'peak_delta': peak_delta},
+        )
+        if tracemalloc.is_tracing():
+            self.maybe_compare_snapshots()
+        self.maybe_recycle()
+        return response
+
+    @staticmethod
+    def take_snapshot():
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+        ))
+
+    def maybe_compare_snapshots(self):
+        now = time.monotonic()
+        with self.lock:
+            if now - self.snapshot_at < settings.MEMORY_SNAPSHOT_INTERVAL:
+                return
+            self.snapshot_at = now
+            previous, self.snapshot = self.snapshot, self.take_snapshot()
+        if previous is None:
+            return
+        top = self.snapshot.compare_to(previous, 'lineno')
+        logger.info(
+            'Worker %s top allocation growth:\n%s', os.getpid(),
+            '\n'.join(str(stat) for stat in top[:settings.MEMORY_TOP_N]),
+        )
+
+    def maybe_recycle(self):
+        limit = settings.MEMORY_MAX_RSS
+        if self.recycling or not limit or rss_bytes() < limit << 20:
+            return
+        self.recycling = True
+        # Сигнал уходит после того, как ответ отправлен и закрыт.
+        request_finished.connect(recycle_once, dispatch_uid='memory-recycle')
+
+
+def recycle_once(**kwargs):
+    request_finished.disconnect(dispatch_uid='memory-recycle')
+    recycle()
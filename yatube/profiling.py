@@ -0,0 +1,126 @@
+"""Opt-in sampling profiler for individual requests.
+
+A sampled request gets a helper thread that reads the request thread's
+stack every PROFILING_INTERVAL seconds. Identical stacks are counted and
+written in the collapsed ("folded") format, one file per request, under
+PROFILING_DIR/<view name>/. The ``flamegraph`` management command merges
+them into an SVG flame graph or a speedscope profile.
+
+Requests are sampled at PROFILING_SAMPLE_RATE, or on demand when they
+carry an ``X-Profile`` header with a token from ``profile_token``.
+"""
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+
+from django.conf import settings
+from django.core import signing
+from django.core.exceptions import MiddlewareNotUsed
+
+TOKEN_SALT = 'yatube.profiling'
+FOLDED_SUFFIX = '.folded'
+
+
+def make_token():
+    return signing.dumps('profile', salt=TOKEN_SALT)
+
+
+def token_is_valid(token):
+    try:
+        signing.loads(
+            token, salt=TOKEN_SALT, max_age=settings.PROFILING_TOKEN_MAX_AGE
+        )
+    except signing.BadSignature:
+        return False
+    return True
+
+
+def frame_name(frame):
+    code = frame.f_code
+    filename = code.co_filename
+    if filename.startswith(settings.BASE_DIR):
+        filename = os.path.relpath(filename, settings.BASE_DIR)
+    else:
+        filename = '/'.join(filename.split(os.sep)[-2:])
+    return f'{code.co_name} ({filename})'
+
+
+class Sampler(threading.Thread):
+    def __init__(self, thread_id, interval):
+        super().__init__(name='yatube-profiler', daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self.stopping = threading.Event()
+
+    def run(self):
+        while not self.stopping.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(frame_name(frame))
+                frame = frame.f_back
+            if stack:
+                self.stacks[';'.join(reversed(stack))] += 1
+
+    def stop(self):
+        self.stopping.set()
+        self.join()
+        return self.stacks
+
+
+def write_folded(directory, stacks):
+    os.makedirs(directory, exist_ok=True)
+    # Время в имени — для сортировки, uuid — чтобы профили одного потока
+    # за одну секунду не затирали друг друга.
+    name = (
+        f'{time.strftime("%Y%m%d-%H%M%S")}-{os.getpid()}-'
+        f'{threading.get_ident()}-{uuid.uuid4().hex}{FOLDED_SUFFIX}'
+    )
+    with open(os.path.join(directory, name), 'w') as f:
+        for stack, count in stacks.items():
+            f.write(f'{stack} {count}\n')
+
+
+def read_folded(paths):
+    stacks = Counter()
+    for path in paths:
+        with open(path) as f:
+            for line in f:
+                stack, _, count = line.rstrip('\n').rpartition(' ')
+                if stack:
+                    stacks[stack] += int(count)
+    return stacks
+
+
+class ProfilingMiddleware:
+    def __init__(self, get_response):
+        if not settings.PROFILING_DIR:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def should_profile(self, request):
+        token = request.META.get('HTTP_X_PROFILE')
+        if token is not None:
+            return token_is_valid(token)
+        return random.random() < settings.PROFILING_SAMPLE_RATE
+
+    def __call__(self, request):
+        if not self.should_profile(request):
+            return self.get_response(request)
+        sampler = Sampler(threading.get_ident(), settings.PROFILING_INTERVAL)
+        sampler.start()
+        try:
+            return self.get_response(request)
+        finally:
+            stacks = sampler.stop()
+            if stacks:
+                match = request.resolver_match
+                view = match.view_name if match else 'unresolved'
+                write_folded(
+                    os.path.join(settings.PROFILING_DIR, view), stacks
+                )
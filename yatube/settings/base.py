@@ -0,0 +1,268 @@
+"""
+Common Django settings for yatube project.
+
+Profile-specific settings live in dev.py and prod.py; the profile is
+selected by the YATUBE_ENV environment variable (see __init__.py).
+
+Generated by 'django-admin startproject' using Django 2.2.
+
+For more information on this file, see
+https://docs.djangoproject.com/en/2.2/topics/settings/
+
+For the full list of settings and their values, see
+https://docs.djangoproject.com/en/2.2/ref/settings/
+"""
+
+import os
+
+# Build paths inside the project like this: os.path.join(BASE_DIR, ...)
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__)
+)))
+
+DEBUG = False
+
+
+# Application definition
+
+INSTALLED_APPS = [
+    'users',
+    'posts', 
+    'jobs',
+    'django.contrib.sites',
+    'django.contrib.flatpages',
+    'django.contrib.admin',
+    'django.contrib.auth',
+    'django.contrib.contenttypes',
+    'django.contrib.sessions',
+    'django.contrib.messages',
+    'django.contrib.staticfiles',
+    'sorl.thumbnail',
+]
+
+MIDDLEWARE = [
+    'yatube.profiling.ProfilingMiddleware',
+    'yatube.memory.MemoryMiddleware',
+    'yatube.db_router.ReplicaMiddleware',
+    'django.middleware.security.SecurityMiddleware',
+    'yatube.compression.CompressionMiddleware',
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.middleware.common.CommonMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware',
+    'users.middleware.CachedAuthenticationMiddleware',
+    'yatube.esi.ESIMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+]
+
+ROOT_URLCONF = 'yatube.urls'
+
+TEMPLATES_DIR = os.path.join(BASE_DIR, "templates")
+
+TEMPLATE_LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+
+TEMPLATES = [
+    {
+        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'DIRS': [TEMPLATES_DIR],
+        'OPTIONS': {
+            'context_processors': [
+                'django.template.context_processors.debug',
+                'django.template.context_processors.request',
+                'django.contrib.auth.context_processors.auth',
+                'django.contrib.messages.context_processors.messages',
+                'posts.context_processors.notifications',
+            ],
+            'loaders': TEMPLATE_LOADERS,
+        },
+    },
+]
+
+WSGI_APPLICATION = 'yatube.wsgi.application'
+
+
+# Database
+# https://docs.djangoproject.com/en/2.2/ref/settings/#databases
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.environ.get(
+            'YATUBE_DB_PATH', os.path.join(BASE_DIR, 'db.sqlite3')
+        ),
+    }
+}
+
+# Реплики для чтения лент (см. yatube.db_router): алиасы из DATABASES,
+# view, которые читают с них, и сколько секунд после записи
+# пользователь читает с основной базы
+DATABASE_ROUTERS = ['yatube.db_router.ReplicaRouter']
+REPLICA_DATABASES = []
+REPLICA_VIEWS = (
+    'index', 'group_posts', 'profile', 'post', 'follow_index', 'tag_posts',
+)
+REPLICA_PIN_SECONDS = 10
+REPLICA_PIN_COOKIE = 'pin_primary'
+
+
+# Password validation
+# https://docs.djangoproject.com/en/2.2/ref/settings/#auth-password-validators
+
+AUTH_PASSWORD_VALIDATORS = [
+    {
+        'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.CommonPasswordValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.NumericPasswordValidator',
+    },
+]
+
+
+# Internationalization
+# https://docs.djangoproject.com/en/2.2/topics/i18n/
+
+LANGUAGE_CODE = 'ru'
+
+TIME_ZONE = 'UTC'
+
+USE_I18N = True
+
+USE_L10N = True
+
+USE_TZ = True
+
+
+# Static files (CSS, JavaScript, Images)
+# https://docs.djangoproject.com/en/2.2/howto/static-files/
+
+STATIC_URL = '/static/'
+STATIC_ROOT = os.environ.get(
+    'YATUBE_STATIC_ROOT', os.path.join(BASE_DIR, "static")
+)
+
+MEDIA_URL = '/media/'
+MEDIA_ROOT = os.path.join(BASE_DIR, 'media') 
+MEDIA_MAX_AGE = 3600
+
+# Передача файлов из MEDIA_ROOT фронтенд-серверу: None (отдает Django),
+# 'x-accel-redirect' (nginx) или 'x-sendfile' (Apache, lighttpd)
+MEDIA_SENDFILE = None
+MEDIA_ACCEL_PREFIX = '/protected-media/'
+
+LOGIN_URL = "/auth/login/"
+LOGIN_REDIRECT_URL = "index" 
+LOGOUT_REDIRECT_URL = "index" 
+
+EMAIL_BACKEND = "django.core.mail.backends.filebased.EmailBackend"
+EMAIL_FILE_PATH = os.path.join(BASE_DIR, "sent_emails")
+
+SITE_ID = 1 
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'sessions': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'sessions',
+    },
+    'compression': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'compression',
+    },
+}
+
+# Движок сессий: cached_db (по умолчанию), db или signed_cookies
+SESSION_ENGINE = 'django.contrib.sessions.backends.' + os.environ.get(
+    'YATUBE_SESSION_ENGINE', 'cached_db'
+)
+SESSION_CACHE_ALIAS = 'sessions'
+
+# Сколько секунд фрагменты отдаются устаревшими, пока один воркер
+# пересчитывает их (см. posts.cache.get_or_compute)
+CACHE_STALE_TIMEOUT = 300
+
+# Сжатые версии общих для всех ответов (см. yatube.compression). Кеш
+# свой в каждом процессе: сжатие дешевле похода в общий кеш.
+COMPRESSION_CACHE_ALIAS = 'compression'
+COMPRESSION_CACHE_TIMEOUT = 300
+COMPRESSION_CACHE_MAX_SIZE = 512 * 1024
+
+# Фоновые задачи (см. jobs.queue). В JOBS_EAGER задачи выполняются
+# сразу в запросе, воркер не нужен.
+JOBS_EAGER = False
+JOBS_LEASE = 300
+JOBS_RETRY_DELAY = 10
+
+# Живая лента (см. posts.live): журнал событий в общем кеше, интервал
+# опроса клиентом и предел пропущенных событий до сброса
+LIVE_EVENT_TIMEOUT = 300
+LIVE_MAX_PENDING = 100
+LIVE_RETRY_MS = 15000
+
+# Профилирование запросов (см. yatube.profiling). Без PROFILING_DIR
+# middleware отключается целиком.
+PROFILING_DIR = None
+PROFILING_SAMPLE_RATE = 0
+PROFILING_INTERVAL = 0.005
+PROFILING_TOKEN_MAX_AGE = 3600
+
+# Память воркеров (см. yatube.memory): прирост RSS за запрос, снимки
+# tracemalloc и перезапуск воркера после MEMORY_MAX_RSS мегабайт
+MEMORY_MONITOR = False
+MEMORY_LOG_DELTA = 1024
+MEMORY_TRACEMALLOC_FRAMES = 0
+MEMORY_SNAPSHOT_INTERVAL = 300
+MEMORY_TOP_N = 10
+MEMORY_MAX_RSS = None
+MEMORY_RECYCLE_SIGNAL = 'SIGTERM'
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'yatube': {
+            'handlers': ['console'],
+            'level': 'INFO',
+        },
+    },
+}
+
+# Разметка отдельных постов в кеше (см. posts.templatetags.post_tags);
+# сбрасывается сигналами при сохранении поста и комментариев
+POST_ITEM_CACHE_TIMEOUT = 3600
+
+# Уведомления (см. posts.notifications)
+NOTIFICATIONS_PER_PAGE = 20
+NOTIFICATIONS_COUNT_TIMEOUT = 300
+NOTIFICATIONS_BATCH = 500
+# Сколько помнить обработанные события, чтобы перезапуск задачи не
+# посчитал их второй раз
+NOTIFICATIONS_SOURCE_TIMEOUT = 24 * 60 * 60
+
+# Пагинация лент (см. posts.pagination): глубже FEED_MAX_PAGES ленты не
+# листаются, до FEED_EXACT_COUNT постов считаются точно, большие ленты —
+# по кешу и оценке планировщика
+FEED_MAX_PAGES = 1000
+FEED_EXACT_COUNT = 1000
+FEED_COUNT_TIMEOUT = 300
+
+USER_CACHE_ALIAS = 'default'
+USER_CACHE_TIMEOUT = 300
+
+# Воркер без админки и flatpages (см. prod.py)
+FEED_ONLY = False
@@ -0,0 +1,15 @@
+from .base import *  # noqa: F401,F403
+
+# SECURITY WARNING: keep the secret key used in production secret!
+SECRET_KEY = 'tacxnqik%)%6mdkd+(9pjajkk2trn^g+%_&7el+d4o$d0qnn@q'
+
+DEBUG = True
+
+JOBS_EAGER = True
+
+ALLOWED_HOSTS = [
+    "localhost",
+    "127.0.0.1",
+    "[::1]",
+    "testserver",
+]
@@ -0,0 +1,93 @@
+import os
+
+from .base import *  # noqa: F401,F403
+from .base import INSTALLED_APPS, TEMPLATE_LOADERS, TEMPLATES, DATABASES
+
+SECRET_KEY = os.environ['YATUBE_SECRET_KEY']
+
+DEBUG = False
+
+ALLOWED_HOSTS = os.environ.get('YATUBE_ALLOWED_HOSTS', 'localhost').split(',')
+
+TEMPLATES[0]['OPTIONS']['loaders'] = [
+    ('django.template.loaders.cached.Loader', TEMPLATE_LOADERS),
+]
+
+DATABASES['default']['CONN_MAX_AGE'] = int(
+    os.environ.get('YATUBE_CONN_MAX_AGE', 600)
+)
+
+# Пути к копиям базы через запятую, например реплики LiteFS/rqlite
+# или снимки на read-only томе.
+REPLICA_DATABASES = []
+for number, path in enumerate(
+    filter(None, os.environ.get('YATUBE_REPLICA_DB_PATHS', '').split(','))
+):
+    alias = f'replica{number}'
+    DATABASES[alias] = dict(
+        DATABASES['default'], NAME=path, TEST={'MIRROR': 'default'}
+    )
+    REPLICA_DATABASES.append(alias)
+
+# Общий для всех воркеров кеш: memcached или Redis, если они заданы,
+# иначе SQLite-файл в /dev/shm, общий для процессов на одной машине.
+if os.environ.get('YATUBE_MEMCACHED'):
+    SHARED_CACHE = {
+        'BACKEND': 'django.core.cache.backends.memcached.PyLibMCCache',
+        'LOCATION': os.environ['YATUBE_MEMCACHED'].split(','),
+    }
+elif os.environ.get('YATUBE_REDIS_URL'):
+    # Требует пакета django-redis
+    SHARED_CACHE = {
+        'BACKEND': 'django_redis.cache.RedisCache',
+        'LOCATION': os.environ['YATUBE_REDIS_URL'],
+    }
+else:
+    SHARED_CACHE = {
+        'BACKEND': 'yatube.sqlite_cache.SQLiteCache',
+        'LOCATION': os.environ.get('YATUBE_CACHE_PATH', ''),
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.environ.get('YATUBE_CACHE_ENTRIES', 10000)),
+        },
+    }
+
+# Сессии и пользователи тоже должны жить в общем кеше, иначе выход
+# или смена пароля в одном воркере не будут видны остальным.
+CACHES = {
+    'default': SHARED_CACHE,
+    'sessions': dict(SHARED_CACHE, KEY_PREFIX='sessions'),
+    'compression': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'compression',
+        'OPTIONS': {'MAX_ENTRIES': 1000},
+    },
+}
+
+# Воркеры, которые отдают только ленты, не загружают админку и flatpages.
+FEED_ONLY = os.environ.get('YATUBE_FEED_ONLY') == '1'
+if FEED_ONLY:
+    INSTALLED_APPS = [
+        app for app in INSTALLED_APPS
+        if app not in (
+            'django.contrib.admin',
+            'django.contrib.flatpages',
+            'django.contrib.sites',
+        )
+    ]
+
+MEDIA_SENDFILE = os.environ.get('YATUBE_MEDIA_SENDFILE') or None
+
+# collectstatic кладет файлы с хешем в имени и их .gz/.br версии,
+# отдает их yatube.static.StaticFilesMiddleware (см. wsgi.py).
+STATICFILES_STORAGE = 'yatube.storage.CompressedManifestStaticFilesStorage'
+
+PROFILING_DIR = os.environ.get('YATUBE_PROFILING_DIR') or None
+PROFILING_SAMPLE_RATE = float(
+    os.environ.get('YATUBE_PROFILING_SAMPLE_RATE', 0)
+)
+
+MEMORY_MONITOR = os.environ.get('YATUBE_MEMORY_MONITOR') == '1'
+MEMORY_TRACEMALLOC_FRAMES = int(
+    os.environ.get('YATUBE_MEMORY_TRACEMALLOC_FRAMES', 0)
+)
+MEMORY_MAX_RSS = int(os.environ.get('YATUBE_MEMORY_MAX_RSS', 0)) or None
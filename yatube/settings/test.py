@@ -0,0 +1,34 @@
+import os
+
+from .dev import *  # noqa: F401,F403
+from .dev import BASE_DIR, DATABASES
+
+# Хеширование паролей намеренно медленное; в тестах это секунды на
+# каждом create_user.
+PASSWORD_HASHERS = [
+    'django.contrib.auth.hashers.MD5PasswordHasher',
+]
+
+DEFAULT_FILE_STORAGE = 'yatube.storage.InMemoryStorage'
+
+TEST_RUNNER = 'yatube.testing.ParallelTestRunner'
+
+# Отдельная база, на которой тесты проверяют чтение с реплики. Роутер
+# обращается к ней, только если тест включит REPLICA_DATABASES.
+DATABASES = dict(DATABASES, replica={
+    'ENGINE': 'django.db.backends.sqlite3',
+    'NAME': os.path.join(BASE_DIR, 'replica.sqlite3'),
+})
+
+
+class DisableMigrations:
+    """Тестовая база создается прямо по моделям, без прогона миграций."""
+
+    def __contains__(self, item):
+        return True
+
+    def __getitem__(self, item):
+        return None
+
+
+MIGRATION_MODULES = DisableMigrations()
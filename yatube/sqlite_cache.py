@@ -0,0 +1,220 @@
+"""SQLite-backed cache shared by every worker process on the host.
+
+Unlike LocMemCache, all processes that point at the same file see the same
+entries, so ``cache.delete()`` in one worker invalidates the fragment for
+all of them. Entries are evicted in least-recently-used order once the
+table grows past MAX_ENTRIES.
+"""
+import os
+import pickle
+import sqlite3
+import tempfile
+import threading
+import time
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+
+def default_location():
+    shm = '/dev/shm'
+    directory = shm if os.path.isdir(shm) else tempfile.gettempdir()
+    return os.path.join(directory, 'yatube-cache.sqlite3')
+
+
+class SQLiteCache(BaseCache):
+    # Не обновляем время доступа чаще, чем раз в секунду на ключ, чтобы
+    # чтение не превращалось в запись.
+    access_resolution = 1.0
+    # Проверяем размер таблицы не на каждом set, а раз в столько записей.
+    cull_every = 50
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        self._path = location or default_location()
+        self._local = threading.local()
+        self._writes = 0
+
+    def _db(self):
+        # Соединение нельзя наследовать через fork, поэтому ключом служит pid.
+        pid = os.getpid()
+        if getattr(self._local, 'pid', None) != pid:
+            db = sqlite3.connect(self._path, timeout=5, isolation_level=None)
+            db.execute('PRAGMA journal_mode=WAL')
+            db.execute('PRAGMA synchronous=NORMAL')
+            db.execute('PRAGMA mmap_size=67108864')
+            db.execute(
+                'CREATE TABLE IF NOT EXISTS cache ('
+                'key TEXT PRIMARY KEY, value BLOB NOT NULL, '
+                'expires REAL, accessed REAL NOT NULL)'
+            )
+            db.execute(
+                'CREATE INDEX IF NOT EXISTS cache_accessed ON cache (accessed)'
+            )
+            self._local.db = db
+            self._local.pid = pid
+        return self._local.db
+
+    def _key(self, key, version):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        return key
+
+    @staticmethod
+    def _expired(expires, now):
+        return expires is not None and expires <= now
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self._key(key, version)
+        now = time.time()
+        db = self._db()
+        with _immediate(db):
+            db.execute(
+                'DELETE FROM cache WHERE key = ? AND expires <= ?', (key, now)
+            )
+            cursor = db.execute(
+                'INSERT OR IGNORE INTO cache VALUES (?, ?, ?, ?)',
+                (key, _dumps(value), self.get_backend_timeout(timeout), now)
+            )
+        added = cursor.rowcount == 1
+        if added:
+            self._maybe_cull()
+        return added
+
+    def get(self, key, default=None, version=None):
+        return self.get_many([key], version=version).get(key, default)
+
+    def get_many(self, keys, version=None):
+        keys = list(keys)
+        if not keys:
+            return {}
+        key_map = {self._key(key, version): key for key in keys}
+        now = time.time()
+        db = self._db()
+        rows = db.execute(
+            'SELECT key, value, expires, accessed FROM cache WHERE key IN (%s)'
+            % ', '.join('?' * len(key_map)),
+            list(key_map)
+        ).fetchall()
+        result, touched = {}, []
+        for db_key, value, expires, accessed in rows:
+            if self._expired(expires, now):
+                continue
+            result[key_map[db_key]] = pickle.loads(value)
+            if now - accessed > self.access_resolution:
+                touched.append((now, db_key))
+        if touched:
+            db.executemany(
+                'UPDATE cache SET accessed = ? WHERE key = ?', touched
+            )
+        return result
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self.set_many({key: value}, timeout, version)
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        now = time.time()
+        expires = self.get_backend_timeout(timeout)
+        rows = [
+            (self._key(key, version), _dumps(value), expires, now)
+            for key, value in data.items()
+        ]
+        db = self._db()
+        with _immediate(db):
+            db.executemany(
+                'INSERT OR REPLACE INTO cache VALUES (?, ?, ?, ?)', rows
+            )
+        self._maybe_cull(len(rows))
+        return []
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self._key(key, version)
+        cursor = self._db().execute(
+            'UPDATE cache SET expires = ? WHERE key = ? '
+            'AND (expires IS NULL OR expires > ?)',
+            (self.get_backend_timeout(timeout), key, time.time())
+        )
+        return cursor.rowcount == 1
+
+    def delete(self, key, version=None):
+        self.delete_many([key], version)
+
+    def delete_many(self, keys, version=None):
+        keys = [self._key(key, version) for key in keys]
+        if keys:
+            self._db().execute(
+                'DELETE FROM cache WHERE key IN (%s)'
+                % ', '.join('?' * len(keys)),
+                keys
+            )
+
+    def has_key(self, key, version=None):
+        key = self._key(key, version)
+        row = self._db().execute(
+            'SELECT expires FROM cache WHERE key = ?', (key,)
+        ).fetchone()
+        return row is not None and not self._expired(row[0], time.time())
+
+    def incr(self, key, delta=1, version=None):
+        # В отличие от BaseCache.incr, чтение и запись идут в одной
+        # транзакции, поэтому счетчик атомарен между процессами.
+        key = self._key(key, version)
+        db = self._db()
+        with _immediate(db):
+            row = db.execute(
+                'SELECT value, expires FROM cache WHERE key = ?', (key,)
+            ).fetchone()
+            if row is None or self._expired(row[1], time.time()):
+                raise ValueError("Key '%s' not found" % key)
+            value = pickle.loads(row[0]) + delta
+            db.execute(
+                'UPDATE cache SET value = ? WHERE key = ?',
+                (_dumps(value), key)
+            )
+        return value
+
+    def clear(self):
+        self._db().execute('DELETE FROM cache')
+
+    def close(self, **kwargs):
+        # Соединение переиспользуется между запросами, как CONN_MAX_AGE.
+        pass
+
+    def _maybe_cull(self, writes=1):
+        self._writes += writes
+        if self._writes < self.cull_every:
+            return
+        self._writes = 0
+        db = self._db()
+        with _immediate(db):
+            db.execute(
+                'DELETE FROM cache WHERE expires <= ?', (time.time(),)
+            )
+            count = db.execute('SELECT COUNT(*) FROM cache').fetchone()[0]
+            if count <= self._max_entries:
+                return
+            evict = count - self._max_entries
+            if self._cull_frequency:
+                evict = max(evict, count // self._cull_frequency)
+            db.execute(
+                'DELETE FROM cache WHERE key IN ('
+                'SELECT key FROM cache ORDER BY accessed LIMIT ?)',
+                (evict,)
+            )
+
+
+class _immediate:
+    """Транзакция BEGIN IMMEDIATE: берет блокировку записи сразу, чтобы
+    параллельные процессы не получали SQLITE_BUSY посреди обновления."""
+
+    def __init__(self, db):
+        self.db = db
+
+    def __enter__(self):
+        self.db.execute('BEGIN IMMEDIATE')
+
+    def __exit__(self, exc_type, exc, tb):
+        self.db.execute('ROLLBACK' if exc_type else 'COMMIT')
+
+
+def _dumps(value):
+    return pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
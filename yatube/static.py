@@ -0,0 +1,115 @@
+"""WSGI layer that serves collected static files before Django sees them.
+
+Files under STATIC_ROOT are indexed once at startup, so a request costs a
+dict lookup. Pre-compressed siblings produced by
+CompressedManifestStaticFilesStorage are chosen by Accept-Encoding, and
+content-hashed names get far-future immutable caching. Bodies are handed
+to the server's ``wsgi.file_wrapper`` so it can use sendfile().
+"""
+import mimetypes
+import os
+import re
+from email.utils import formatdate
+from wsgiref.util import FileWrapper
+
+from .encoding import negotiate
+
+HASHED_NAME = re.compile(r'\.[0-9a-f]{12}\.\w+$')
+IMMUTABLE = 'public, max-age=31536000, immutable'
+SHORT_LIVED = 'public, max-age=60'
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+
+class StaticFile:
+    def __init__(self, path, url_path):
+        stat = os.stat(path)
+        self.path = path
+        self.size = stat.st_size
+        self.etag = f'"{int(stat.st_mtime):x}-{stat.st_size:x}"'
+        self.last_modified = formatdate(stat.st_mtime, usegmt=True)
+        content_type, _ = mimetypes.guess_type(path)
+        self.content_type = content_type or 'application/octet-stream'
+        if self.content_type.startswith('text/') or self.content_type in (
+            'application/javascript', 'application/json',
+        ):
+            self.content_type += '; charset=utf-8'
+        self.cache_control = (
+            IMMUTABLE if HASHED_NAME.search(url_path) else SHORT_LIVED
+        )
+        self.variants = {
+            encoding: (path + suffix, os.path.getsize(path + suffix))
+            for encoding, suffix in ENCODINGS
+            if os.path.isfile(path + suffix)
+        }
+
+    def select(self, accept_encoding):
+        encoding = negotiate(accept_encoding, tuple(self.variants))
+        if encoding is None:
+            return None, (self.path, self.size)
+        return encoding, self.variants[encoding]
+
+
+def index_files(root, prefix):
+    files = {}
+    compressed_suffixes = tuple(suffix for _, suffix in ENCODINGS)
+    for directory, _, names in os.walk(root):
+        for name in names:
+            path = os.path.join(directory, name)
+            if name.endswith(compressed_suffixes) and os.path.isfile(
+                path[:path.rindex('.')]
+            ):
+                continue
+            url_path = prefix + os.path.relpath(path, root).replace(
+                os.sep, '/'
+            )
+            files[url_path] = StaticFile(path, url_path)
+    return files
+
+
+class StaticFilesMiddleware:
+    def __init__(self, application, root, prefix):
+        self.application = application
+        self.prefix = prefix
+        self.files = index_files(root, prefix) if os.path.isdir(root) else {}
+
+    def __call__(self, environ, start_response):
+        path = environ.get('PATH_INFO', '')
+        if not path.startswith(self.prefix):
+            return self.application(environ, start_response)
+        static_file = self.files.get(path)
+        if static_file is None:
+            return self.application(environ, start_response)
+        if environ['REQUEST_METHOD'] not in ('GET', 'HEAD'):
+            start_response('405 Method Not Allowed', [('Allow', 'GET, HEAD')])
+            return [b'']
+        return self.serve(static_file, environ, start_response)
+
+    def serve(self, static_file, environ, start_response):
+        encoding, (path, size) = static_file.select(
+            environ.get('HTTP_ACCEPT_ENCODING', '')
+        )
+        etag = static_file.etag
+        if encoding:
+            etag = f'{etag[:-1]}-{encoding}"'
+        headers = [
+            ('Cache-Control', static_file.cache_control),
+            ('ETag', etag),
+            ('Last-Modified', static_file.last_modified),
+        ]
+        if static_file.variants:
+            headers.append(('Vary', 'Accept-Encoding'))
+        if environ.get('HTTP_IF_NONE_MATCH') == etag:
+            start_response('304 Not Modified', headers)
+            return [b'']
+
+        headers += [
+            ('Content-Type', static_file.content_type),
+            ('Content-Length', str(size)),
+        ]
+        if encoding:
+            headers.append(('Content-Encoding', encoding))
+        start_response('200 OK', headers)
+        if environ['REQUEST_METHOD'] == 'HEAD':
+            return [b'']
+        file_wrapper = environ.get('wsgi.file_wrapper', FileWrapper)
+        return file_wrapper(open(path, 'rb'), 64 * 1024)
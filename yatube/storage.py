@@ -0,0 +1,121 @@
+import gzip
+import threading
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+from django.core.files.storage import Storage
+from django.utils import timezone
+from django.utils.deconstruct import deconstructible
+from django.utils.encoding import filepath_to_uri
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_EXTENSIONS = (
+    '.css', '.js', '.map', '.svg', '.json', '.txt', '.html', '.xml',
+    '.eot', '.ttf', '.otf',
+)
+
+
+def compress_variants(content):
+    """Сжатые варианты содержимого, которые заметно меньше оригинала."""
+    variants = {'.gz': gzip.compress(content, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants['.br'] = brotli.compress(content)
+    return {
+        suffix: data for suffix, data in variants.items()
+        if len(data) < len(content) * 0.95
+    }
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """Manifest-хранилище, которое при collectstatic кладет рядом с
+    хешированными файлами их .gz и (при наличии brotli) .br версии."""
+
+    # Файлы, которых нет в манифесте (например, bootstrap и jquery, если
+    # их не положили в STATICFILES_DIRS), отдаем по исходному имени,
+    # а не роняем рендер страницы — включая обработчик 500.
+    manifest_strict = False
+
+    def stored_name(self, name):
+        try:
+            return super().stored_name(name)
+        except ValueError:
+            # Без манифеста Django хеширует файл с диска, а его нет.
+            return name
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        for hashed_name in set(self.hashed_files.values()):
+            if hashed_name.endswith(COMPRESSIBLE_EXTENSIONS):
+                self.compress(hashed_name)
+
+    def compress(self, name):
+        with self.open(name) as original:
+            content = original.read()
+        for suffix, data in compress_variants(content).items():
+            if self.exists(name + suffix):
+                self.delete(name + suffix)
+            self._save(name + suffix, ContentFile(data))
+
+
+@deconstructible
+class InMemoryStorage(Storage):
+    """Хранилище файлов в памяти процесса для тестов: загрузки не пишутся
+    в MEDIA_ROOT и не переживают процесс."""
+
+    def __init__(self, base_url=None):
+        self.base_url = base_url
+        self.files = {}
+        self.lock = threading.Lock()
+
+    def _open(self, name, mode='rb'):
+        with self.lock:
+            content, _ = self.files[name]
+        return ContentFile(content, name=name)
+
+    def _save(self, name, content):
+        content.seek(0)
+        data = content.read()
+        if isinstance(data, str):
+            data = data.encode()
+        with self.lock:
+            self.files[name] = (data, timezone.now())
+        return name
+
+    def delete(self, name):
+        with self.lock:
+            self.files.pop(name, None)
+
+    def exists(self, name):
+        return name in self.files
+
+    def listdir(self, path):
+        prefix = path.rstrip('/') + '/' if path else ''
+        directories, files = set(), []
+        for name in list(self.files):
+            if not name.startswith(prefix):
+                continue
+            head, sep, tail = name[len(prefix):].partition('/')
+            if sep:
+                directories.add(head)
+            else:
+                files.append(head)
+        return sorted(directories), files
+
+    def size(self, name):
+        return len(self.files[name][0])
+
+    def url(self, name):
+        base_url = self.base_url or settings.MEDIA_URL
+        return base_url + filepath_to_uri(name)
+
+    def get_modified_time(self, name):
+        return self.files[name][1]
+
+    get_created_time = get_accessed_time = get_modified_time
@@ -0,0 +1,12 @@
+from django.test.runner import DiscoverRunner, default_test_processes
+
+
+class ParallelTestRunner(DiscoverRunner):
+    """DiscoverRunner, который по умолчанию запускает тесты во всех
+    процессорах, каждый процесс со своей копией тестовой базы.
+    Число процессов задают --parallel или DJANGO_TEST_PROCESSES."""
+
+    @classmethod
+    def add_arguments(cls, parser):
+        super().add_arguments(parser)
+        parser.set_defaults(parallel=default_test_processes())
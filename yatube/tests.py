@@ -0,0 +1,466 @@
+import asyncio
+import gzip
+import hashlib
+import io
+import os
+import tempfile
+import time
+from unittest import mock
+from multiprocessing import get_context
+
+from django.core.cache import cache, caches
+from django.conf import settings
+from django.core.management import call_command
+from django.core.signals import request_finished
+from django.contrib.auth import get_user_model
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase
+from django.urls import reverse
+
+from .asgi import WSGIToASGI, application as asgi_application, build_environ
+from .compression import CompressionMiddleware, brotli, negotiate
+from .memory import MemoryMiddleware
+from .profiling import ProfilingMiddleware, make_token
+from .sqlite_cache import SQLiteCache
+from .static import HASHED_NAME, StaticFilesMiddleware
+
+
+def make_cache(path, **options):
+    return SQLiteCache(path, {'OPTIONS': options})
+
+
+def _set_in_child(path):
+    make_cache(path).set('shared', 'из другого процесса')
+
+
+class SQLiteCacheTest(SimpleTestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'cache.sqlite3')
+        self.cache = make_cache(self.path)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_set_get_delete(self):
+        self.cache.set('key', {'value': 1})
+        self.assertEqual(self.cache.get('key'), {'value': 1})
+        self.cache.delete('key')
+        self.assertIsNone(self.cache.get('key'))
+
+    def test_expired_entries_are_missing(self):
+        self.cache.set('key', 'value', timeout=0)
+        self.assertIsNone(self.cache.get('key'))
+        self.assertTrue(self.cache.add('key', 'new'))
+        self.assertFalse(self.cache.add('key', 'other'))
+        self.assertEqual(self.cache.get('key'), 'new')
+
+    def test_entries_are_shared_between_processes(self):
+        other_worker = make_cache(self.path)
+        self.cache.set('fragment', 'html')
+        other_worker.delete('fragment')
+        self.assertIsNone(self.cache.get('fragment'))
+
+        process = get_context('fork').Process(
+            target=_set_in_child, args=(self.path,)
+        )
+        process.start()
+        process.join()
+        self.assertEqual(self.cache.get('shared'), 'из другого процесса')
+
+    def test_incr_is_stored(self):
+        self.cache.set('counter', 1)
+        self.assertEqual(make_cache(self.path).incr('counter', 5), 6)
+        self.assertEqual(self.cache.get('counter'), 6)
+        with self.assertRaises(ValueError):
+            self.cache.incr('missing')
+
+    def test_least_recently_used_are_evicted(self):
+        cache = make_cache(self.path, MAX_ENTRIES=10, CULL_FREQUENCY=2)
+        cache.cull_every = 1
+        cache.access_resolution = 0
+        cache.set('hot', 'value')
+        for i in range(20):
+            time.sleep(0.001)
+            cache.get('hot')
+            cache.set(f'cold-{i}', i)
+        self.assertEqual(cache.get('hot'), 'value')
+        self.assertIsNone(cache.get('cold-0'))
+
+
+class StaticFilesMiddlewareTest(SimpleTestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        css = b'body { color: red; }\n' * 100
+        self.write('site.0123456789ab.css', css)
+        self.write('site.0123456789ab.css.gz', gzip.compress(css))
+        self.write('plain.js', b'var a = 1;')
+        self.app = StaticFilesMiddleware(
+            self.fallback, self.tmp.name, '/static/'
+        )
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, name, content):
+        with open(os.path.join(self.tmp.name, name), 'wb') as f:
+            f.write(content)
+
+    def fallback(self, environ, start_response):
+        start_response('404 Not Found', [])
+        return [b'django']
+
+    def request(self, path, **environ):
+        response = {}
+
+        def start_response(status, headers):
+            response['status'] = status
+            response['headers'] = dict(headers)
+
+        environ = dict(REQUEST_METHOD='GET', PATH_INFO=path, **environ)
+        response['body'] = b''.join(self.app(environ, start_response))
+        return response
+
+    def test_hashed_file_is_immutable_and_precompressed(self):
+        response = self.request(
+            '/static/site.0123456789ab.css', HTTP_ACCEPT_ENCODING='gzip, br'
+        )
+        self.assertEqual(response['status'], '200 OK')
+        self.assertEqual(response['headers']['Content-Encoding'], 'gzip')
+        self.assertIn('immutable', response['headers']['Cache-Control'])
+        self.assertEqual(
+            gzip.decompress(response['body']),
+            b'body { color: red; }\n' * 100
+        )
+
+    def test_refused_encoding_is_not_served(self):
+        for header in ('gzip;q=0', 'x-gzip-like'):
+            with self.subTest(header=header):
+                response = self.request(
+                    '/static/site.0123456789ab.css', HTTP_ACCEPT_ENCODING=header
+                )
+                self.assertNotIn('Content-Encoding', response['headers'])
+
+    def test_conditional_get(self):
+        etag = self.request('/static/plain.js')['headers']['ETag']
+        response = self.request('/static/plain.js', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response['status'], '304 Not Modified')
+        self.assertNotIn('immutable', response['headers']['Cache-Control'])
+
+    def test_unknown_files_fall_through(self):
+        self.assertEqual(self.request('/static/missing.css')['body'], b'django')
+        self.assertEqual(self.request('/index/')['body'], b'django')
+
+
+class CompressedStorageTest(SimpleTestCase):
+    def test_collectstatic_writes_compressed_siblings(self):
+        with tempfile.TemporaryDirectory() as source, \
+                tempfile.TemporaryDirectory() as root:
+            with open(os.path.join(source, 'app.js'), 'w') as f:
+                f.write('console.log("yatube");\n' * 200)
+            with self.settings(
+                STATICFILES_DIRS=[source],
+                STATIC_ROOT=root,
+                STATICFILES_STORAGE=(
+                    'yatube.storage.CompressedManifestStaticFilesStorage'
+                ),
+            ):
+                call_command('collectstatic', interactive=False, verbosity=0)
+                names = os.listdir(root)
+        hashed = [n for n in names if HASHED_NAME.search(n)]
+        self.assertEqual(len(hashed), 1)
+        self.assertIn(hashed[0] + '.gz', names)
+
+
+class ManifestStaticPagesTest(TestCase):
+    def test_pages_render_with_manifest_storage(self):
+        cache.clear()
+        with tempfile.TemporaryDirectory() as source, \
+                tempfile.TemporaryDirectory() as root:
+            os.makedirs(os.path.join(source, 'bootstrap/dist/css'))
+            with open(os.path.join(
+                source, 'bootstrap/dist/css/bootstrap.min.css'
+            ), 'w') as f:
+                f.write('body { margin: 0; }\n')
+            with self.settings(
+                STATICFILES_DIRS=[source],
+                STATIC_ROOT=root,
+                STATICFILES_STORAGE=(
+                    'yatube.storage.CompressedManifestStaticFilesStorage'
+                ),
+            ):
+                call_command('collectstatic', interactive=False, verbosity=0)
+                response = self.client.get('/')
+        self.assertEqual(response.status_code, 200)
+        # Собранный файл получает хеш в имени, отсутствующий в манифесте
+        # jquery отдается по исходному имени.
+        self.assertRegex(
+            response.content.decode(),
+            r'/static/bootstrap/dist/css/bootstrap\.min\.[0-9a-f]{12}\.css'
+        )
+        self.assertContains(response, '/static/jquery/dist/jquery.min.js')
+
+
+class MediaViewTest(SimpleTestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        os.mkdir(os.path.join(self.tmp.name, 'posts'))
+        self.content = bytes(range(256)) * 40
+        with open(os.path.join(self.tmp.name, 'posts', 'big.png'), 'wb') as f:
+            f.write(self.content)
+        self.override = self.settings(MEDIA_ROOT=self.tmp.name)
+        self.override.enable()
+
+    def tearDown(self):
+        self.override.disable()
+        self.tmp.cleanup()
+
+    def test_full_file_and_conditional_get(self):
+        response = self.client.get('/media/posts/big.png')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'image/png')
+        self.assertEqual(b''.join(response.streaming_content), self.content)
+        response = self.client.get(
+            '/media/posts/big.png', HTTP_IF_NONE_MATCH=response['ETag']
+        )
+        self.assertEqual(response.status_code, 304)
+
+    def test_byte_ranges(self):
+        response = self.client.get(
+            '/media/posts/big.png', HTTP_RANGE='bytes=100-199'
+        )
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], 'bytes 100-199/10240')
+        self.assertEqual(
+            b''.join(response.streaming_content), self.content[100:200]
+        )
+        response = self.client.get(
+            '/media/posts/big.png', HTTP_RANGE='bytes=-10'
+        )
+        self.assertEqual(
+            b''.join(response.streaming_content), self.content[-10:]
+        )
+        response = self.client.get(
+            '/media/posts/big.png', HTTP_RANGE='bytes=20000-'
+        )
+        self.assertEqual(response.status_code, 416)
+
+    def test_sendfile_handoff(self):
+        with self.settings(MEDIA_SENDFILE='x-accel-redirect'):
+            response = self.client.get('/media/posts/big.png')
+        self.assertEqual(
+            response['X-Accel-Redirect'], '/protected-media/posts/big.png'
+        )
+        self.assertEqual(response.content, b'')
+
+    def test_paths_outside_media_root(self):
+        response = self.client.get('/media/../settings/base.py')
+        self.assertEqual(response.status_code, 404)
+
+
+class CompressionTest(SimpleTestCase):
+    def test_negotiation(self):
+        self.assertEqual(negotiate('gzip, deflate'), 'gzip')
+        self.assertIsNone(negotiate('gzip;q=0, identity'))
+        self.assertIsNone(negotiate(''))
+        self.assertEqual(
+            negotiate('gzip, br'), 'br' if brotli is not None else 'gzip'
+        )
+
+    def test_html_is_compressed_once(self):
+        caches['compression'].clear()
+        response = self.client.get(
+            '/no/such/page/here/', HTTP_ACCEPT_ENCODING='gzip'
+        )
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        html = gzip.decompress(response.content)
+        self.assertIn('Ошибка 404'.encode(), html)
+        key = f'compressed:gzip:{hashlib.sha1(html).hexdigest()}'
+        self.assertEqual(caches['compression'].get(key), response.content)
+
+    def test_personal_pages_are_not_cached(self):
+        caches['compression'].clear()
+        content = b'<p>personal</p>' * 100
+        middleware = CompressionMiddleware(
+            lambda request: HttpResponse(content)
+        )
+        request = RequestFactory().get('/', HTTP_ACCEPT_ENCODING='gzip')
+        request.user = mock.Mock(is_authenticated=True)
+        response = middleware(request)
+        self.assertEqual(gzip.decompress(response.content), content)
+        key = f'compressed:gzip:{hashlib.sha1(content).hexdigest()}'
+        self.assertIsNone(caches['compression'].get(key))
+
+    def test_media_is_not_recompressed(self):
+        with tempfile.TemporaryDirectory() as root:
+            with open(os.path.join(root, 'a.html'), 'wb') as f:
+                f.write(b'<p>media</p>' * 100)
+            with self.settings(MEDIA_ROOT=root):
+                response = self.client.get(
+                    '/media/a.html', HTTP_ACCEPT_ENCODING='gzip'
+                )
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+
+class WSGIToASGITest(SimpleTestCase):
+    @staticmethod
+    def wsgi_app(environ, start_response):
+        start_response('201 Created', [('Content-Type', 'text/plain')])
+        body = environ['wsgi.input'].read()
+        return [b'path=', environ['PATH_INFO'].encode(), b' body=', body]
+
+    def call(self, app, scope, messages):
+        sent = []
+
+        async def receive():
+            return messages.pop(0)
+
+        async def send(message):
+            sent.append(message)
+
+        asyncio.run(app(scope, receive, send))
+        return sent
+
+    def test_request_body_and_streamed_response(self):
+        sent = self.call(
+            WSGIToASGI(self.wsgi_app),
+            {'type': 'http', 'method': 'POST', 'path': '/new/',
+             'headers': [(b'content-type', b'text/plain')]},
+            [
+                {'type': 'http.request', 'body': b'te', 'more_body': True},
+                {'type': 'http.request', 'body': b'xt'},
+            ],
+        )
+        self.assertEqual(sent[0]['status'], 201)
+        self.assertIn((b'content-type', b'text/plain'), sent[0]['headers'])
+        self.assertEqual(
+            b''.join(m['body'] for m in sent[1:]), b'path=/new/ body=text'
+        )
+        self.assertFalse(sent[-1].get('more_body'))
+
+    def test_django_application(self):
+        sent = self.call(
+            asgi_application,
+            {'type': 'http', 'method': 'GET', 'path': '/no/such/page/here/',
+             'headers': []},
+            [{'type': 'http.request', 'body': b''}],
+        )
+        self.assertEqual(sent[0]['status'], 404)
+
+    def test_environ_path_and_repeated_headers(self):
+        environ = build_environ({
+            'type': 'http', 'method': 'GET', 'path': '/100%25/пост/',
+            'headers': [
+                (b'cookie', b'a=1'), (b'cookie', b'b=2'),
+                (b'accept', b'text/html'), (b'accept', b'*/*'),
+            ],
+        }, b'')
+        self.assertEqual(
+            environ['PATH_INFO'].encode('latin-1').decode(), '/100%25/пост/'
+        )
+        self.assertEqual(environ['HTTP_COOKIE'], 'a=1; b=2')
+        self.assertEqual(environ['HTTP_ACCEPT'], 'text/html,*/*')
+
+
+def _slow_view(request):
+    deadline = time.perf_counter() + 0.05
+    while time.perf_counter() < deadline:
+        pass
+    return 'response'
+
+
+class ProfilingTest(SimpleTestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.override = self.settings(
+            PROFILING_DIR=self.tmp.name,
+            PROFILING_SAMPLE_RATE=0,
+            PROFILING_INTERVAL=0.001,
+        )
+        self.override.enable()
+        self.middleware = ProfilingMiddleware(_slow_view)
+
+    def tearDown(self):
+        self.override.disable()
+        self.tmp.cleanup()
+
+    def request(self, **headers):
+        request = RequestFactory().get('/', **headers)
+        request.resolver_match = None
+        return self.middleware(request)
+
+    def test_only_signed_requests_are_profiled(self):
+        self.request()
+        self.request(HTTP_X_PROFILE='forged')
+        self.assertEqual(os.listdir(self.tmp.name), [])
+        self.request(HTTP_X_PROFILE=make_token())
+        self.assertEqual(
+            len(os.listdir(os.path.join(self.tmp.name, 'unresolved'))), 1
+        )
+
+    def test_flamegraph_merges_profiles(self):
+        for _ in range(3):
+            self.request(HTTP_X_PROFILE=make_token())
+        self.assertEqual(
+            len(os.listdir(os.path.join(self.tmp.name, 'unresolved'))), 3
+        )
+        output = os.path.join(self.tmp.name, 'graph.svg')
+        call_command(
+            'flamegraph', 'unresolved', output=output, stdout=io.StringIO()
+        )
+        with open(output) as f:
+            svg = f.read()
+        self.assertTrue(svg.startswith('<svg'))
+        self.assertIn('_slow_view (yatube/tests.py)', svg)
+
+
+class MemoryMiddlewareTest(SimpleTestCase):
+    def allocate(self, request):
+        self.garbage = bytearray(4 << 20)
+        return 'response'
+
+    def test_request_growth_is_logged_and_worker_recycled(self):
+        with self.settings(
+            MEMORY_MONITOR=True, MEMORY_LOG_DELTA=1024, MEMORY_MAX_RSS=1
+        ):
+            middleware = MemoryMiddleware(self.allocate)
+            with self.assertLogs('yatube.memory', 'INFO') as logs, \
+                    mock.patch('yatube.memory.recycle') as recycle:
+                middleware(RequestFactory().get('/'))
+                recycle.assert_not_called()
+                request_finished.send(sender=None)
+                request_finished.send(sender=None)
+        recycle.assert_called_once_with()
+        self.assertIn('rss +', logs.output[0])
+
+
+class ReplicaRouterTest(TestCase):
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        cache.clear()
+        self.override = self.settings(REPLICA_DATABASES=['replica'])
+        self.override.enable()
+        self.user = get_user_model().objects.create_user(username='author')
+        self.client.force_login(self.user)
+        # Реплика отстает: пользователь уже есть, поста еще нет.
+        self.user.save(using='replica', force_insert=True)
+
+    def tearDown(self):
+        self.override.disable()
+
+    def test_feed_reads_replica_until_user_writes(self):
+        from posts.models import Post
+        Post.objects.create(text='Пост на основной базе', author=self.user)
+        response = self.client.get(reverse('index'))
+        self.assertNotContains(response, 'Пост на основной базе')
+        self.assertNotIn(settings.REPLICA_PIN_COOKIE, response.cookies)
+
+        response = self.client.post(reverse('new_post'), {'text': 'Новый'})
+        self.assertIn(settings.REPLICA_PIN_COOKIE, response.cookies)
+        cache.clear()
+        response = self.client.get(reverse('index'))
+        self.assertContains(response, 'Пост на основной базе')
+        self.assertContains(response, 'Новый')
+        self.assertEqual(Post.objects.using('replica').count(), 0)
@@ -1,43 +1,59 @@
-from django.contrib.flatpages import views
 from django.conf import settings
 from django.conf.urls import handler404, handler500
 from django.conf.urls.static import static
-from django.contrib import admin
+from django.http import Http404
 from django.urls import include, path
 
-urlpatterns = [
-     path('admin/', 
-         admin.site.urls, 
-         name='admin'),
+from yatube.media import serve_media
 
-     path('about/', 
-         include('django.contrib.flatpages.urls')),
+if settings.FEED_ONLY:
+    def flatpage(request, url):
+        # Статические страницы обслуживают полные воркеры, здесь
+        # маршруты нужны только для {% url %} в шаблонах.
+        raise Http404
+    urlpatterns = []
+else:
+    from django.contrib import admin
+    from django.contrib.flatpages.views import flatpage
+    urlpatterns = [
+         path('admin/', 
+             admin.site.urls, 
+             name='admin'),
 
+         path('about/', 
+             include('django.contrib.flatpages.urls')),
+    ]
+
+urlpatterns += [
      path('auth/', 
          include('users.urls')),
 
      path('auth/', 
          include('django.contrib.auth.urls')),
 
+     path(settings.MEDIA_URL.lstrip('/') + '<path:path>',
+         serve_media,
+         name='media'),
+
      path('', 
          include('posts.urls')),
 ]
 
 urlpatterns += [
     path('about-us/', 
-         views.flatpage, 
+         flatpage, 
          {'url': '/about-us/'}, 
          name='about'),
     path('terms/', 
-         views.flatpage, 
+         flatpage, 
          {'url': '/terms/'}, 
          name='terms'),
     path('about-author/', 
-         views.flatpage, 
+         flatpage, 
          {'url': '/about-author/'}, 
          name='author'),
     path('about-spec/', 
-         views.flatpage, 
+         flatpage, 
          {'url': '/about-spec/'}, 
          name='spec'),
 ] 
@@ -46,5 +62,4 @@ handler404 = "posts.views.page_not_found"
 handler500 = "posts.views.server_error" 
 
 if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
     urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT) 
\ No newline at end of file
@@ -0,0 +1,29 @@
+import os
+
+from django.apps import apps
+from django.conf import settings
+from django.template import engines
+
+
+def project_template_dirs():
+    dirs = [d for engine in settings.TEMPLATES for d in engine['DIRS']]
+    for app_config in apps.get_app_configs():
+        if app_config.path.startswith(settings.BASE_DIR):
+            dirs.append(os.path.join(app_config.path, 'templates'))
+    return [d for d in dirs if os.path.isdir(d)]
+
+
+def warm_templates():
+    """Заранее компилирует шаблоны проекта, чтобы cached loader не делал
+    этого на первых запросах воркера. Возвращает число шаблонов."""
+    engine = engines['django']
+    warmed = 0
+    for template_dir in project_template_dirs():
+        for root, _, files in os.walk(template_dir):
+            for name in files:
+                if not name.endswith('.html'):
+                    continue
+                path = os.path.join(root, name)
+                engine.get_template(os.path.relpath(path, template_dir))
+                warmed += 1
+    return warmed